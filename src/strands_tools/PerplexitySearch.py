@@ -1,8 +1,12 @@
 import asyncio
+import copy
 import os
 import re
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List, Literal, Optional, Union
+from typing import Dict, List, Literal, Optional, Tuple, Union
 
 from .errors import NotConfiguredError
 
@@ -12,6 +16,8 @@ MAX_TOKENS_LIMIT = 1_000_000
 MAX_QUERIES_PER_REQUEST = 5
 RATE_LIMIT_PER_SECOND = 50
 API_TOOL_TIMEOUT_SECONDS = int(os.getenv("API_TOOL_TIMEOUT_SECONDS", "7"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("PERPLEXITY_SEARCH_CACHE_MAX_ENTRIES", "256"))
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("PERPLEXITY_SEARCH_CACHE_TTL_SECONDS", "300"))
 
 RecencyFilter = Literal["day", "week", "month", "year"]
 
@@ -105,21 +111,103 @@ class SearchResponse:
     error: Optional[str] = None
 
 
+CacheKey = Tuple[str, Tuple[str, ...]]
+
+
+class SearchCache:
+    """
+    Bounded, TTL-limited LRU of successful searches, hit only by the same queries with the same options.
+
+    Queries are compared after collapsing whitespace, so wording, order and punctuation all matter.
+    Callers get a copy of the cached response, never the stored object. Safe to share between threads.
+    """
+
+    def __init__(self, max_entries: int = SEARCH_CACHE_MAX_ENTRIES, ttl: float = SEARCH_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[CacheKey, Tuple[SearchResponse, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(payload: dict) -> CacheKey:
+        queries = payload["query"] if isinstance(payload["query"], list) else [payload["query"]]
+        normalized = tuple(" ".join(q.split()) for q in queries)
+        options = repr(sorted((k, v) for k, v in payload.items() if k != "query"))
+        return options, normalized
+
+    def get(self, key: CacheKey) -> Optional[SearchResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(response)
+
+    def put(self, key: CacheKey, response: SearchResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        stored = copy.deepcopy(response)
+        with self._lock:
+            self._entries[key] = (stored, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# One cache per API key for the perplexity_search tool, which builds a new client for every call
+_tool_caches: Dict[str, SearchCache] = {}
+_tool_caches_lock = threading.Lock()
+
+
+def _tool_cache(api_key: str) -> SearchCache:
+    with _tool_caches_lock:
+        cache = _tool_caches.get(api_key)
+        if cache is None:
+            cache = _tool_caches[api_key] = SearchCache()
+        return cache
+
+
 class PerplexitySearchClient:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[SearchCache] = None):
+        """Pass a SearchCache to reuse recent results for repeated searches; caching is off by default."""
         self.api_key = api_key or os.environ.get("PERPLEXITY_API_KEY")
         if not self.api_key:
             raise ValueError("API key required. Set PERPLEXITY_API_KEY or pass api_key.")
         self.headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
         self._semaphore = asyncio.Semaphore(RATE_LIMIT_PER_SECOND)
+        self._cache = cache
 
     async def search_async(self, config: SearchConfig) -> SearchResponse:
+        try:
+            payload = config.to_payload()
+        except Exception as exc:
+            return SearchResponse(results=[], error=str(exc))
+        if self._cache is None:
+            return await self._search_uncached(payload)
+        cache_key = SearchCache.key_for(payload)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+        response = await self._search_uncached(payload)
+        if response.error is None:
+            self._cache.put(cache_key, response)
+        return response
+
+    async def _search_uncached(self, payload: dict) -> SearchResponse:
         aiohttp = _require_aiohttp()
         async with self._semaphore:
             timeout = aiohttp.ClientTimeout(total=API_TOOL_TIMEOUT_SECONDS)
             async with aiohttp.ClientSession(timeout=timeout) as session:
                 try:
-                    async with session.post(API_URL, json=config.to_payload(), headers=self.headers) as resp:
+                    async with session.post(API_URL, json=payload, headers=self.headers) as resp:
                         if resp.status == 429:
                             return SearchResponse(results=[], error="Rate limited")
                         resp.raise_for_status()
@@ -179,7 +267,10 @@ def perplexity_search(
     search_language_filter: Optional[List[str]] = None,
     country: Optional[str] = None,
 ) -> dict:
-    client = PerplexitySearchClient()
+    api_key = os.environ.get("PERPLEXITY_API_KEY")
+    # Repeated searches within SEARCH_CACHE_TTL_SECONDS are served from the per-key cache;
+    # set PERPLEXITY_SEARCH_CACHE_MAX_ENTRIES=0 to turn it off
+    client = PerplexitySearchClient(api_key, cache=_tool_cache(api_key) if api_key else None)
     config = SearchConfig(
         query=query,
         max_results=max_results,
@@ -6,12 +6,23 @@ browser instances on the local machine using Playwright.
 """
 
 import asyncio
+import contextvars
+import errno
+import functools
 import logging
 import os
-from typing import Any, Dict, Optional
+import random
+import re
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Tuple
+from urllib.parse import urldefrag
 
 from playwright.async_api import Browser as PlaywrightBrowser
+from playwright.async_api import Error as PlaywrightError
 from playwright.async_api import Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from .models import (
     NavigateAction, NewTabAction, SwitchTabAction, CloseTabAction,
     ClickAction, TypeAction, EvaluateAction, BackAction, ForwardAction, RefreshAction,
@@ -24,6 +35,215 @@ from strands_tools.utils.image_processing import cache_image_bytes, compress_ima
 logger = logging.getLogger(__name__)
 
 
+# CDP connect retry: exponential backoff with jitter, bounded by total elapsed time
+CDP_CONNECT_BASE_DELAY = 0.1
+CDP_CONNECT_MAX_DELAY = 3.0
+CDP_CONNECT_JITTER = 0.5
+CDP_CONNECT_MAX_WAIT = 30.0
+# Reconnect after an unexpected CDP disconnect: 1s, 2s, 4s, 8s, 16s between attempts
+CDP_RECONNECT_BASE_DELAY = 1.0
+CDP_RECONNECT_ATTEMPTS = 5
+# How long to wait for Electron to open its first window once CDP is connected
+CDP_PAGE_WAIT_TIMEOUT_MS = 15000
+# Reuse the resolved content page without asking the shell again for this long (seconds);
+# navigate/new/switch/close tab invalidate it immediately
+ACTIVE_PAGE_CACHE_TTL = 0.25
+# How long session setup waits for a page's preload to expose window.electron (seconds)
+CDP_SHELL_WAIT_TIMEOUT = 5.0
+# Bound on the one-shot window.electron check used when re-acquiring the shell (seconds)
+SHELL_PROBE_TIMEOUT = 1.0
+# How long navigate waits for the active tab's load event before returning anyway
+NAVIGATE_LOAD_TIMEOUT_MS = 10000
+# Errors that retrying cannot fix (bad credentials, unsupported endpoint). Playwright's generic
+# "Protocol error (...)" also covers transient failures such as a target closing mid-connect, so it stays retryable.
+_FATAL_CDP_ERROR_MARKERS = ("unauthorized", "forbidden", "unsupported")
+_FATAL_CDP_HTTP_STATUSES = frozenset({401, 403})
+# 401/403 as a standalone status token, never as part of a port, address or longer number (":9401", "4030")
+_FATAL_CDP_STATUS_PATTERN = re.compile(r"(?<![\w:.])(?:401|403)(?![\w.])")
+# Socket errors that mean Electron is not listening yet (or restarting); anything else from the OS is permanent
+_RECOVERABLE_CDP_ERRNOS = frozenset(
+    {errno.ECONNREFUSED, errno.ECONNRESET, errno.ECONNABORTED, errno.ENETUNREACH, errno.EHOSTUNREACH, errno.ETIMEDOUT}
+)
+
+# Shell helpers, installed once per document so hot paths send a short call instead of the source.
+# __strandsActiveTabUrl resolves tabs.list() in the shell and returns only the active tab's URL (or null);
+# it binds tabs.list on first use and keeps it, so later calls skip the window.electron lookup chain.
+# __strandsShellDispatch runs [namespace, method, args] calls in order in one JS turn and returns
+# null or an error message per call.
+_SHELL_HELPERS_JS = """window.__strandsActiveTabUrl = window.__strandsActiveTabUrl || (() => {
+    let listTabs = null;
+    return async () => {
+        listTabs = listTabs || window.electron.tabs.list.bind(window.electron.tabs);
+        const tabs = await listTabs();
+        const active = tabs.find(t => t.isActive);
+        return active ? active.url : null;
+    };
+})();
+window.__strandsShellDispatch = window.__strandsShellDispatch || (async (ops) => {
+    const errors = [];
+    for (const [ns, method, args] of ops) {
+        try {
+            await window.electron[ns][method](...args);
+            errors.push(null);
+        } catch (e) {
+            errors.push(String((e && e.message) || e));
+        }
+    }
+    return errors;
+});"""
+_ACTIVE_TAB_URL_JS = "() => window.__strandsActiveTabUrl()"
+_SHELL_DISPATCH_JS = "ops => window.__strandsShellDispatch(ops)"
+# Shell API calls; arguments travel as evaluate args so the source text never varies per call
+_SHELL_NAVIGATE_JS = "url => window.electron.browser.navigate(url)"
+_SHELL_NEW_TAB_JS = "() => window.electron.tabs.create()"
+_SHELL_SWITCH_TAB_JS = "id => window.electron.tabs.switch(id)"
+_SHELL_CLOSE_TAB_JS = "id => window.electron.tabs.close(id)"
+# URL prefixes of pages probed first when looking for the Electron shell page
+_SHELL_URL_PREFIXES = tuple(
+    prefix for prefix in os.getenv("STRANDS_BROWSER_SHELL_URL_PREFIXES", "file://,app://").split(",") if prefix
+)
+
+# Background services a launched Chromium does not need for automation; each one otherwise adds
+# network requests and CDP events Playwright has to process
+_QUIET_CHROMIUM_ARGS = (
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--disable-component-update",
+    "--disable-features=Translate,BackForwardCache",
+)
+
+CdpState = Literal["disconnected", "connected", "reconnecting", "failed"]
+
+
+async def _retry_with_backoff(
+    operation: Callable[[], Awaitable[Any]],
+    *,
+    max_elapsed: float,
+    base: float,
+    cap: float,
+    jitter: float,
+    is_fatal: Callable[[Exception], bool],
+    description: str,
+) -> Any:
+    """
+    Await operation() until it succeeds, sleeping min(cap, base * 2**attempt) plus up to
+    `jitter` proportional jitter between attempts.
+
+    Fatal errors are raised immediately. Once max_elapsed seconds have passed the last
+    error is raised without a trailing sleep.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_elapsed
+    attempt = 0
+    while True:
+        try:
+            return await operation()
+        except Exception as e:
+            if is_fatal(e):
+                raise
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise
+            delay = min(min(cap, base * 2**attempt) * (1 + random.uniform(0, jitter)), remaining)
+            attempt += 1
+            logger.info("%s... (attempt %d failed, retrying in %.2fs)", description, attempt, delay)
+            await asyncio.sleep(delay)
+
+
+@dataclass
+class _ResolvedPages:
+    """Shell and content pages resolved once for a batch of actions."""
+
+    shell: Page
+    content: Optional[Page] = None
+
+
+# Set while batch_actions runs so each action reuses the batch's resolved pages
+_batch_pages: contextvars.ContextVar[Optional[_ResolvedPages]] = contextvars.ContextVar(
+    "local_chromium_batch_pages", default=None
+)
+
+
+def _normalize_url(url: str) -> str:
+    """Normalize a URL for page matching (ignores a single trailing slash)."""
+    return url.removesuffix("/")
+
+
+def _is_fragment_navigation(current_url: str, target_url: str) -> bool:
+    """True if going from current_url to target_url only changes the #fragment (no load event fires)."""
+    target, fragment = urldefrag(target_url)
+    return bool(fragment) and _normalize_url(urldefrag(current_url)[0]) == _normalize_url(target)
+
+
+@functools.cache
+def _default_user_data_dir() -> str:
+    """Resolve the default profile dir on first use; home-dir lookup can hit pwd or the registry."""
+    return os.path.join(os.path.expanduser("~"), ".browser_automation")
+
+
+def _is_valid_tab_id(tab_id: Any) -> bool:
+    """Tab ids go to the shell as evaluate arguments; only strings and integers are meaningful there."""
+    return isinstance(tab_id, (str, int)) and not isinstance(tab_id, bool)
+
+
+def _is_dispatchable_tab_action(action: Any) -> bool:
+    """True for a new/switch/close tab action whose tab id (if any) can be sent to the shell."""
+    if isinstance(action, NewTabAction):
+        return True
+    if isinstance(action, SwitchTabAction):
+        return _is_valid_tab_id(action.tab_id)
+    return isinstance(action, CloseTabAction) and (action.tab_id is None or _is_valid_tab_id(action.tab_id))
+
+
+def _tab_action_op(action: Any) -> Tuple[str, str, List[Any]]:
+    """Shell API call ([namespace, method, args]) for a new/switch/close tab action."""
+    if isinstance(action, NewTabAction):
+        return ("tabs", "create", [])
+    if isinstance(action, SwitchTabAction):
+        return ("tabs", "switch", [action.tab_id])
+    return ("tabs", "close", [action.tab_id or "active"])
+
+
+def _tab_action_result(action: Any, error: Optional[str]) -> Dict[str, Any]:
+    """Tool result for a dispatched tab action, worded like the single-action handlers."""
+    if isinstance(action, NewTabAction):
+        ok, failed = "Created new tab via App API", "Failed to create tab"
+    elif isinstance(action, SwitchTabAction):
+        ok, failed = f"Switched to tab {action.tab_id} via App API", "Failed to switch tab"
+    else:
+        ok, failed = "Closed tab via App API", "Failed to close tab"
+    if error is None:
+        return {"status": "success", "content": [{"text": ok}]}
+    return {"status": "error", "content": [{"text": f"{failed}: {error}"}]}
+
+
+def _save_screenshot(requested_path: str, data: bytes) -> str:
+    """Write JPEG screenshot bytes under the screenshots dir (unless absolute) and return the path."""
+    screenshots_dir = os.getenv("STRANDS_BROWSER_SCREENSHOTS_DIR", "screenshots")
+    os.makedirs(screenshots_dir, exist_ok=True)
+    path = requested_path if os.path.isabs(requested_path) else os.path.join(screenshots_dir, requested_path)
+    if not path.lower().endswith((".jpg", ".jpeg")):
+        path = f"{os.path.splitext(path)[0]}.jpg"
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def _is_fatal_cdp_error(error: Exception) -> bool:
+    """Return True if a CDP connect error should not be retried."""
+    if isinstance(error, (ConnectionError, asyncio.TimeoutError, PlaywrightTimeoutError)):
+        return False
+    if isinstance(error, OSError) and error.errno is not None:
+        return error.errno not in _RECOVERABLE_CDP_ERRNOS
+    if getattr(error, "status", None) in _FATAL_CDP_HTTP_STATUSES:
+        return True
+    message = str(error).lower()
+    return bool(_FATAL_CDP_STATUS_PATTERN.search(message)) or any(
+        marker in message for marker in _FATAL_CDP_ERROR_MARKERS
+    )
+
+
 class LocalChromiumBrowser(Browser):
     """Local Chromium browser implementation using Playwright."""
 
@@ -44,15 +264,34 @@ class LocalChromiumBrowser(Browser):
         self._default_context_options: Dict[str, Any] = {}
         # Cache for fast lookups
         self._cached_shell_page: Optional[Page] = None
+        # Every page ever confirmed as the shell; lets re-acquisition skip the JS probe
+        self._shell_pages: "weakref.WeakSet[Page]" = weakref.WeakSet()
+        # Normalized URL -> page, kept current by page navigation/close events; weak so a page
+        # Playwright drops without a close event is not kept alive by the index
+        self._page_by_url: "weakref.WeakValueDictionary[str, Page]" = weakref.WeakValueDictionary()
+        self._indexed_pages: "weakref.WeakSet[Page]" = weakref.WeakSet()
+        # Contexts that already have the page listener and shell helper init script; setup runs again on
+        # every new session and reconnect, and registering twice would duplicate both
+        self._prepared_contexts: weakref.WeakSet = weakref.WeakSet()
+        # (active tab URL, page, monotonic time resolved) from the last content-page lookup
+        self._cached_content_page: Optional[Tuple[str, Page, float]] = None
         # Cache CDP browser connection (can only connect once)
         self._cdp_browser: Optional[PlaywrightBrowser] = None
+        # Started right after CDP connects so Electron's first window is caught before session setup
+        self._pending_first_page: Optional[asyncio.Future] = None
+        # Health of the CDP connection; drives auto-reconnect when Electron restarts
+        self._cdp_state: CdpState = "disconnected"
+        self._reconnect_task: Optional[asyncio.Future] = None
+
+    @property
+    def cdp_state(self) -> CdpState:
+        """Current state of the CDP connection to Electron."""
+        return self._cdp_state
 
     async def start_platform(self) -> None:
         """Initialize the local Chromium browser platform with configuration (ASYNC)."""
         # Read environment variables
-        user_data_dir = os.getenv(
-            "STRANDS_BROWSER_USER_DATA_DIR", os.path.join(os.path.expanduser("~"), ".browser_automation")
-        )
+        user_data_dir = os.getenv("STRANDS_BROWSER_USER_DATA_DIR") or _default_user_data_dir()
         headless = os.getenv("STRANDS_BROWSER_HEADLESS", "false").lower() == "true"
         width = int(os.getenv("STRANDS_BROWSER_WIDTH", "1280"))
         height = int(os.getenv("STRANDS_BROWSER_HEIGHT", "800"))
@@ -63,7 +302,7 @@ class LocalChromiumBrowser(Browser):
         # Build default launch options
         self._default_launch_options = {
             "headless": headless,
-            "args": [f"--window-size={width},{height}"],
+            "args": [f"--window-size={width},{height}", *_QUIET_CHROMIUM_ARGS],
         }
         self._default_launch_options.update(self._launch_options)
 
@@ -76,7 +315,7 @@ class LocalChromiumBrowser(Browser):
         cdp_url = os.getenv("STRANDS_BROWSER_CDP_URL") or os.getenv("CDP_URL") or "http://localhost:9222"
         if cdp_url:
             self._default_launch_options["cdp_url"] = cdp_url
-            logger.info(f"Configured to attach to browser via CDP at {cdp_url}")
+            logger.info("Configured to attach to browser via CDP at %s", cdp_url)
 
     async def create_browser_session(self) -> PlaywrightBrowser:
         """Create a new local Chromium browser instance for a session."""
@@ -91,34 +330,34 @@ class LocalChromiumBrowser(Browser):
                 return self._cdp_browser
 
             cdp_url = self._default_launch_options["cdp_url"]
-            logger.info(f"Connecting to existing browser via CDP: {cdp_url}")
-
-            # Retry loop for socket connection (handles race condition where Electron starts slower than Python)
-            last_error = None
-
-            # Try for 30 seconds (60 attempts * 0.5s)
-            logger.info(f"Connecting to CDP at {cdp_url}...")
-            for i in range(60):
-                try:
-                    # Set a short timeout (2s) so we don't hang if the socket is open but silent
-                    self._cdp_browser = await self._playwright.chromium.connect_over_cdp(cdp_url, timeout=2000)
-                    logger.info("✅ CDP connection established and cached")
-                    return self._cdp_browser
-                except Exception as e:
-                    last_error = e
-                    if i % 10 == 0: # Log every 5 seconds
-                        logger.info(f"Waiting for Electron CDP... ({i+1}/60) - Ensure Electron is running.")
-                    await asyncio.sleep(0.5)
-
-            # If all retries fail, raise the last error
-            logger.error(f"Failed to connect to CDP at {cdp_url} after 30 seconds.")
-            raise RuntimeError(f"Failed to connect to CDP at {cdp_url}. Is Electron running? Error: {last_error}")
+            logger.info("Connecting to existing browser via CDP: %s", cdp_url)
+
+            # Retry with backoff (handles race condition where Electron starts slower than Python)
+            try:
+                # Set a short timeout (2s) so we don't hang if the socket is open but silent
+                browser = await _retry_with_backoff(
+                    lambda: self._playwright.chromium.connect_over_cdp(cdp_url, timeout=2000),
+                    max_elapsed=CDP_CONNECT_MAX_WAIT,
+                    base=CDP_CONNECT_BASE_DELAY,
+                    cap=CDP_CONNECT_MAX_DELAY,
+                    jitter=CDP_CONNECT_JITTER,
+                    is_fatal=_is_fatal_cdp_error,
+                    description="Waiting for Electron CDP (ensure Electron is running)",
+                )
+            except Exception as e:
+                if _is_fatal_cdp_error(e):
+                    logger.error("CDP connection to %s failed with a non-retryable error: %s", cdp_url, e)
+                    raise
+                logger.error("Failed to connect to CDP at %s within %.0f seconds.", cdp_url, CDP_CONNECT_MAX_WAIT)
+                raise RuntimeError(f"Failed to connect to CDP at {cdp_url}. Is Electron running? Error: {e}") from e
+
+            logger.info("✅ CDP connection established and cached")
+            self._on_cdp_connected(browser)
+            return browser
 
         # Handle persistent context if specified
         if self._default_launch_options.get("persistent_context"):
-            persistent_user_data_dir = self._default_launch_options.get(
-                "user_data_dir", os.path.join(os.path.expanduser("~"), ".browser_automation")
-            )
+            persistent_user_data_dir = self._default_launch_options.get("user_data_dir") or _default_user_data_dir()
 
             # For persistent context, return the context itself as it acts like a browser
             return await self._playwright.chromium.launch_persistent_context(
@@ -138,9 +377,80 @@ class LocalChromiumBrowser(Browser):
         """Close the local Chromium browser. No platform specific changes needed (ASYNC)."""
         pass
 
+    async def _async_cleanup(self) -> None:
+        """Stop any reconnect before sessions close, so their disconnects are not treated as failures."""
+        self._set_cdp_state("disconnected")
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        self._cdp_browser = None
+        self._reset_page_caches()
+        await super()._async_cleanup()
+
+    def _set_cdp_state(self, state: CdpState) -> None:
+        if state != self._cdp_state:
+            logger.info("CDP connection state: %s -> %s", self._cdp_state, state)
+            self._cdp_state = state
+
+    def _on_cdp_connected(self, browser: PlaywrightBrowser) -> None:
+        """Cache a fresh CDP connection and watch it for disconnects."""
+        self._cdp_browser = browser
+        self._set_cdp_state("connected")
+        browser.on("disconnected", self._on_cdp_disconnected)
+        self._pending_first_page = self._watch_first_page(browser)
+
+    def _on_cdp_disconnected(self, browser: PlaywrightBrowser) -> None:
+        """Drop state tied to the lost connection and start reconnecting."""
+        if browser is not self._cdp_browser or self._cdp_state != "connected":
+            return
+        logger.warning("CDP connection to Electron lost")
+        self._cdp_browser = None
+        self._reset_page_caches()
+        self._set_cdp_state("reconnecting")
+        self._reconnect_task = asyncio.ensure_future(self._reconnect_cdp(browser))
+
+    async def _reconnect_cdp(self, old_browser: PlaywrightBrowser) -> None:
+        """Reconnect over CDP with exponential backoff and re-attach the sessions that used old_browser."""
+        cdp_url = self._default_launch_options["cdp_url"]
+        for attempt in range(CDP_RECONNECT_ATTEMPTS):
+            await asyncio.sleep(CDP_RECONNECT_BASE_DELAY * 2**attempt)
+            if self._cdp_state != "reconnecting" or not self._playwright:
+                return
+            try:
+                browser = await self._playwright.chromium.connect_over_cdp(cdp_url, timeout=2000)
+            except Exception as e:
+                if _is_fatal_cdp_error(e):
+                    logger.error("CDP reconnect to %s failed with a non-retryable error: %s", cdp_url, e)
+                    break
+                logger.warning("CDP reconnect attempt %d/%d failed: %s", attempt + 1, CDP_RECONNECT_ATTEMPTS, e)
+                continue
+
+            self._on_cdp_connected(browser)
+            try:
+                for session in self._sessions.values():
+                    if session.browser is not old_browser:
+                        continue
+                    session.browser, session.context, session.page = await self._setup_session_from_browser(browser)
+                    session.tabs.clear()
+                    session.add_tab("main", session.page)
+            except Exception as e:
+                logger.error("Failed to re-attach sessions after CDP reconnect: %s", e)
+                self._set_cdp_state("failed")
+            return
+
+        self._set_cdp_state("failed")
+
+    def _reset_page_caches(self) -> None:
+        """Forget every cached page; they belong to a connection that is gone."""
+        self._cached_shell_page = None
+        self._cached_content_page = None
+        self._page_by_url.clear()
+        if self._pending_first_page is not None:
+            self._pending_first_page.cancel()
+            self._pending_first_page = None
+
     async def _setup_session_from_browser(self, browser_or_context):
         """Setup session components from browser or context."""
-        import asyncio
         if isinstance(browser_or_context, PlaywrightBrowser):
             # If we are connected via CDP (Electron), try to find existing pages first
             # to ensure we attach to the window that has the Preload API loaded.
@@ -154,45 +464,32 @@ class LocalChromiumBrowser(Browser):
                     if session_context.pages:
                         session_page = session_context.pages[0]
                     else:
-                        session_page = await session_context.new_page()
+                        session_page = await self._wait_for_first_page(session_context)
                 else:
                     logger.warning("No existing contexts found in Electron CDP. Creating new context (fallback).")
                     session_context = await session_browser.new_context()
                     session_page = await session_context.new_page()
 
-                async def _is_shell(page: Page) -> bool:
-                    try:
-                        return await asyncio.wait_for(page.evaluate("!!window.electron"), timeout=1.0)
-                    except Exception:
-                        return False
+                for ctx in session_browser.contexts:
+                    await self._prepare_context(ctx)
+
+                # Wait on the default page and every other page concurrently for the shell; Electron may
+                # still be running its preload, so each page waits for window.electron to appear.
+                other_pages = [page for ctx in contexts for page in ctx.pages if page is not session_page]
+                target_page = await self._first_shell_page([session_page, *other_pages], timeout=CDP_SHELL_WAIT_TIMEOUT)
 
-                # Prefer the default page, then do a single bounded scan for the shell.
-                if await _is_shell(session_page):
-                    self._cached_shell_page = session_page
+                if target_page is session_page:
+                    self._remember_shell_page(session_page)
                     logger.info("Confirmed attached page is the Electron Shell ✅")
+                elif target_page:
+                    logger.info("Found Electron Shell via window.electron at: %s", target_page.url)
+                    session_context = target_page.context
+                    session_page = target_page
+                    self._remember_shell_page(target_page)
                 else:
-                    target_context = None
-                    target_page = None
-                    for ctx in contexts:
-                        for page in ctx.pages:
-                            if page is session_page:
-                                continue
-                            if await _is_shell(page):
-                                target_context = ctx
-                                target_page = page
-                                logger.info(f"Found Electron Shell via window.electron at: {page.url}")
-                                break
-                        if target_page:
-                            break
-
-                    if target_context and target_page:
-                        session_context = target_context
-                        session_page = target_page
-                        self._cached_shell_page = target_page
-                    else:
-                        logger.warning(
-                            "Shell page not found via window.electron; using default context/page for CDP session."
-                        )
+                    logger.warning(
+                        "Shell page not found via window.electron; using default context/page for CDP session."
+                    )
             else:
                 # Normal non-persistent case
                 session_browser = browser_or_context
@@ -206,6 +503,26 @@ class LocalChromiumBrowser(Browser):
 
         return session_browser, session_context, session_page
 
+    @staticmethod
+    def _watch_first_page(browser: PlaywrightBrowser) -> Optional[asyncio.Future]:
+        """Start waiting for the default context's first page if it has none yet."""
+        contexts = browser.contexts
+        if not contexts or contexts[0].pages:
+            return None
+        return asyncio.ensure_future(contexts[0].wait_for_event("page", timeout=CDP_PAGE_WAIT_TIMEOUT_MS))
+
+    async def _wait_for_first_page(self, context) -> Page:
+        """Wait for the context to open its first page (Electron still starting), else open one."""
+        pending, self._pending_first_page = self._pending_first_page, None
+        try:
+            if pending is not None:
+                # Usually already resolved: the wait started as soon as CDP connected
+                return await pending
+            return await context.wait_for_event("page", timeout=CDP_PAGE_WAIT_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            logger.warning("No page appeared in the Electron CDP context. Creating new page (fallback).")
+            return await context.new_page()
+
     def _get_all_pages(self) -> list:
         """Get all pages from all sessions."""
         pages = []
@@ -214,79 +531,294 @@ class LocalChromiumBrowser(Browser):
                 pages.extend(session.context.pages)
         return pages
 
-    async def _get_shell_page(self) -> Optional[Page]:
-        """Find the Electron Shell Page. Uses cache for speed."""
-        import asyncio
-        # Return cached if still valid
-        if self._cached_shell_page:
-            try:
-                # Quick check if page is still open
-                if not self._cached_shell_page.is_closed():
-                    return self._cached_shell_page
-            except:
-                pass
-            self._cached_shell_page = None
-        
-        # Find and cache
-        for session in self._sessions.values():
-            if not session.context:
-                continue
-            for page in session.context.pages:
-                try:
-                    # Fix: Use asyncio.wait_for instead of invalid timeout arg
-                    is_shell = await asyncio.wait_for(
-                        page.evaluate("!!window.electron"), 
-                        timeout=5.0
+    @staticmethod
+    async def _wait_for_shell(page: Page, timeout: float) -> bool:
+        """Return True once the page exposes the Electron preload API, False if it does not within timeout."""
+        try:
+            # Native Playwright timeout: no wrapper task, and the wait ends on the Chromium side too
+            await page.wait_for_function("() => !!window.electron", timeout=timeout * 1000)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    async def _is_shell_page(page: Page) -> bool:
+        """Check once, without waiting for a preload, whether the page exposes window.electron."""
+        try:
+            return bool(await asyncio.wait_for(page.evaluate("() => !!window.electron"), SHELL_PROBE_TIMEOUT))
+        except Exception:
+            return False
+
+    async def _probe_shell_pages(self, pages: list) -> Optional[Page]:
+        """Check every page once, concurrently, and return the first (in order) exposing window.electron."""
+        if not pages:
+            return None
+        results = await asyncio.gather(*(self._is_shell_page(page) for page in pages))
+        return next((page for page, is_shell in zip(pages, results, strict=True) if is_shell), None)
+
+    async def _first_shell_page(self, pages: list, timeout: float) -> Optional[Page]:
+        """Watch all pages concurrently and return the first to expose window.electron within timeout."""
+        if not pages:
+            return None
+        probes = {asyncio.ensure_future(self._wait_for_shell(page, timeout)): page for page in pages}
+        pending = set(probes)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for probe in done:
+                    if probe.result():
+                        return probes[probe]
+            return None
+        finally:
+            for probe in pending:
+                probe.cancel()
+
+    async def _prepare_context(self, context) -> None:
+        """Index the context's pages and install the shell helpers, once per context."""
+        if context in self._prepared_contexts:
+            return
+        self._prepared_contexts.add(context)
+        self._index_context(context)
+        # Covers documents loaded from now on; the current shell gets the helpers on first use
+        await context.add_init_script(_SHELL_HELPERS_JS)
+
+    def _index_context(self, context) -> None:
+        """Index the context's current pages by URL and any page it opens later."""
+        for page in context.pages:
+            self._index_page(page)
+        context.on("page", self._index_page)
+
+    def _index_page(self, page: Page) -> None:
+        """Keep page in the URL index across navigations until it closes."""
+        self._page_by_url[_normalize_url(page.url)] = page
+        if page in self._indexed_pages:
+            return
+        self._indexed_pages.add(page)
+
+        def _on_navigated(frame):
+            if frame.parent_frame is None:
+                self._page_by_url[_normalize_url(frame.url)] = page
+
+        def _on_close(_page):
+            for url in [url for url, indexed in self._page_by_url.items() if indexed is page]:
+                self._page_by_url.pop(url, None)
+
+        page.on("framenavigated", _on_navigated)
+        page.once("close", _on_close)
+
+    def _lookup_page_by_url(self, url: str) -> Optional[Page]:
+        """Return the open page currently at url from the index, dropping stale entries."""
+        key = _normalize_url(url)
+        page = self._page_by_url.get(key)
+        if page is None:
+            return None
+        if page.is_closed() or _normalize_url(page.url) != key:
+            self._page_by_url.pop(key, None)
+            return None
+        return page
+
+    def _remember_shell_page(self, page: Page) -> None:
+        """Cache the shell page and drop it from the cache as soon as it closes."""
+        if page is self._cached_shell_page:
+            return
+        self._cached_shell_page = page
+        self._shell_pages.add(page)
+
+        def _on_close(_page):
+            if self._cached_shell_page is page:
+                self._cached_shell_page = None
+
+        page.once("close", _on_close)
+
+    @staticmethod
+    async def _evaluate_shell_helper(shell_page: Page, script: str, helper: str, arg: Any = None) -> Any:
+        """Call an installed shell helper, installing the helpers first if this document lacks them."""
+        try:
+            return await shell_page.evaluate(script, arg)
+        except PlaywrightError as e:
+            if helper not in str(e):
+                raise
+        await shell_page.evaluate(_SHELL_HELPERS_JS)
+        return await shell_page.evaluate(script, arg)
+
+    async def _read_active_tab_url(self, shell_page: Page) -> Optional[str]:
+        """Return the shell's active tab URL."""
+        return await self._evaluate_shell_helper(shell_page, _ACTIVE_TAB_URL_JS, "__strandsActiveTabUrl")
+
+    async def _dispatch_tab_actions(self, shell: Page, actions: List[Any]) -> List[Dict[str, Any]]:
+        """Run consecutive new/switch/close tab actions as one shell evaluate, one result per action."""
+        ops = [_tab_action_op(action) for action in actions]
+        try:
+            errors = await self._evaluate_shell_helper(shell, _SHELL_DISPATCH_JS, "__strandsShellDispatch", ops)
+        except Exception as e:
+            errors = [str(e)] * len(actions)
+        self._invalidate_content_page()
+        return [_tab_action_result(action, error) for action, error in zip(actions, errors, strict=True)]
+
+    def _invalidate_content_page(self) -> None:
+        """Forget the cached content page after the active tab may have changed."""
+        self._cached_content_page = None
+        batch = _batch_pages.get()
+        if batch is not None:
+            batch.content = None
+
+    async def _current_shell_page(self) -> Optional[Page]:
+        """Return the batch's shell page when inside batch_actions, else look it up."""
+        batch = _batch_pages.get()
+        if batch is not None:
+            return batch.shell
+        return await self._get_shell_page()
+
+    def _known_content_page(self) -> Optional[Page]:
+        """Return the content page already resolved by the batch or the fresh cache, without asking the shell."""
+        batch = _batch_pages.get()
+        if batch is not None and batch.content is not None:
+            return batch.content
+        if self._cached_content_page:
+            _, cached_page, resolved_at = self._cached_content_page
+            if time.monotonic() - resolved_at < ACTIVE_PAGE_CACHE_TTL and not cached_page.is_closed():
+                return cached_page
+        return None
+
+    async def _current_content_page(self, shell: Page) -> Optional[Page]:
+        """Return the batch's content page when inside batch_actions, else look it up."""
+        batch = _batch_pages.get()
+        if batch is None:
+            return await self._get_active_content_page(shell)
+        if batch.content is None:
+            batch.content = await self._get_active_content_page(shell)
+        return batch.content
+
+    async def batch_actions(self, actions: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Run several actions in order against shell/content pages resolved once.
+
+        The content page is looked up again only after an action that may change
+        the active tab (navigate, new/switch/close tab). Consecutive new/switch/close
+        tab actions are sent to the shell together in a single evaluate.
+
+        Args:
+            actions: Navigate, tab, click, type, evaluate or screenshot actions.
+
+        Returns:
+            One result dict per action, in order.
+        """
+        handlers = {
+            NavigateAction: self._async_navigate,
+            NewTabAction: self._async_new_tab,
+            SwitchTabAction: self._async_switch_tab,
+            CloseTabAction: self._async_close_tab,
+            ClickAction: self._async_click,
+            TypeAction: self._async_type,
+            EvaluateAction: self._async_evaluate,
+            ScreenshotAction: self._async_screenshot,
+        }
+        shell = await self._get_shell_page()
+        if not shell:
+            error = {"status": "error", "content": [{"text": "Cannot run actions: Shell page not found."}]}
+            return [error for _ in actions]
+
+        token = _batch_pages.set(_ResolvedPages(shell=shell))
+        try:
+            results = []
+            i = 0
+            while i < len(actions):
+                run_end = i
+                while run_end < len(actions) and _is_dispatchable_tab_action(actions[run_end]):
+                    run_end += 1
+                if run_end - i > 1:
+                    results.extend(await self._dispatch_tab_actions(shell, actions[i:run_end]))
+                    i = run_end
+                    continue
+
+                action = actions[i]
+                i += 1
+                handler = handlers.get(type(action))
+                if handler is None:
+                    results.append(
+                        {"status": "error", "content": [{"text": f"Unsupported batch action: {type(action).__name__}"}]}
                     )
-                    if is_shell:
-                        self._cached_shell_page = page
-                        logger.info(f"Re-acquired Shell Page: {page.url}")
-                        return page
-                except:
                     continue
-        return None
+                results.append(await handler(action))
+            return results
+        finally:
+            _batch_pages.reset(token)
+
+    async def _get_shell_page(self) -> Optional[Page]:
+        """Find the Electron Shell Page. Uses cache for speed."""
+        if self._cdp_state in ("reconnecting", "failed"):
+            logger.warning("Shell page unavailable: CDP connection is %s", self._cdp_state)
+            return None
+
+        # The page's close event clears the cache, so a cached page is always open
+        if self._cached_shell_page is not None:
+            return self._cached_shell_page
+
+        pages = self._get_all_pages()
+        # Pages already identified as the shell need no probe
+        for page in pages:
+            if page in self._shell_pages and not page.is_closed():
+                self._remember_shell_page(page)
+                return page
+
+        # page.url is tracked locally, so it only decides which pages to probe first: any file:// or
+        # app:// page could be a content tab, and only window.electron confirms the shell. Unlike session
+        # setup there is no preload to wait for here, so each page is checked once and never waited on.
+        likely = [page for page in pages if page.url.startswith(_SHELL_URL_PREFIXES)]
+        page = await self._probe_shell_pages(likely)
+        if page is None:
+            page = await self._probe_shell_pages([p for p in pages if p not in likely])
+        if page:
+            self._remember_shell_page(page)
+            logger.info("Re-acquired Shell Page: %s", page.url)
+        return page
 
     async def _get_active_content_page(self, shell_page: Page) -> Optional[Page]:
         """Find the active content page. Fast path using URL match."""
-        import asyncio
+        if self._cached_content_page:
+            _, cached_page, resolved_at = self._cached_content_page
+            # Bursts of actions (click then screenshot) skip the tabs.list round trip
+            if time.monotonic() - resolved_at < ACTIVE_PAGE_CACHE_TTL and not cached_page.is_closed():
+                return cached_page
+
         try:
-            print("DEBUG: _get_active_content_page running fixed version with asyncio.wait_for")
-            # Get active tab URL
-            # Fix: page.evaluate does not accept timeout argument
-            target_url = await asyncio.wait_for(
-                shell_page.evaluate(
-                    "window.electron.tabs.list().then(tabs => (tabs.find(t => t.isActive) || {}).url)"
-                ),
-                timeout=5.0
-            )
-            
-            logger.info(f"DEBUG: Tabs API reports active URL: {target_url}")
-            
+            # page.evaluate has no timeout argument, so bound the tabs.list() call here
+            target_url = await asyncio.wait_for(self._read_active_tab_url(shell_page), timeout=5.0)
+            logger.debug("Tabs API reports active URL: %s", target_url)
+
             if not target_url:
-                logger.warning("DEBUG: No active URL returned from Tabs API")
+                logger.warning("No active URL returned from Tabs API")
                 return None
-            
-            # Find matching page
+
+            if self._cached_content_page:
+                cached_url, cached_page, _ = self._cached_content_page
+                if cached_url == target_url and not cached_page.is_closed():
+                    self._cached_content_page = (target_url, cached_page, time.monotonic())
+                    return cached_page
+                self._cached_content_page = None
+
+            page = self._lookup_page_by_url(target_url)
+            if page is not None and page is not shell_page:
+                self._cached_content_page = (target_url, page, time.monotonic())
+                return page
+
+            # Index miss (page opened before indexing started): fall back to scanning every page
+            target_key = _normalize_url(target_url)
             candidates = []
-            for session in self._sessions.values():
-                if not session.context:
+            for p in self._get_all_pages():
+                if p is shell_page:
                     continue
-                for p in session.context.pages:
-                     if p != shell_page:
-                         candidates.append(p.url)
-                         # Loose matching to handle trailing slashes
-                         # Normalize both to remove trailing slash for comparison
-                         p_url_norm = p.url.rstrip("/")
-                         t_url_norm = target_url.rstrip("/")
-                         
-                         if p_url_norm == t_url_norm:
-                             logger.info(f"DEBUG: Found matching content page: {p.url}")
-                             return p
-            
-            logger.warning(f"DEBUG: No matching Playwright page found for {target_url}. Candidates: {candidates}")
+                candidates.append(p.url)
+                if _normalize_url(p.url) == target_key:
+                    logger.debug("Found matching content page: %s", p.url)
+                    self._index_page(p)
+                    self._cached_content_page = (target_url, p, time.monotonic())
+                    return p
+
+            logger.warning("No matching Playwright page found for %s. Candidates: %s", target_url, candidates)
             return None
         except Exception as e:
-            logger.error(f"Error finding content page: {e}")
+            logger.error("Error finding content page: %s", e)
             return None
 
     # --- App-Aware Action Overrides ---
@@ -295,16 +827,26 @@ class LocalChromiumBrowser(Browser):
 
     async def _async_navigate(self, action: NavigateAction) -> Dict[str, Any]:
         """Override: Use Shell API to navigate the active tab. NEVER use page.goto()."""
-        shell = await self._get_shell_page()
+        shell = await self._current_shell_page()
         if shell:
-            logger.info(f"Using Shell API to navigate to {action.url}")
+            logger.info("Using Shell API to navigate to %s", action.url)
             try:
-                # Escape single quotes in URL to prevent JS injection
-                safe_url = action.url.replace("'", "\\'")
-                await shell.evaluate(f"window.electron.browser.navigate('{safe_url}')")
+                # Only wait on a page that is already resolved: looking it up would cost a tabs.list round
+                # trip on every navigate. A fragment-only change fires no load event, so it is not waited on.
+                content = self._known_content_page()
+                if content is None or _is_fragment_navigation(content.url, action.url):
+                    await shell.evaluate(_SHELL_NAVIGATE_JS, action.url)
+                else:
+                    # Return once the active tab has loaded, so following actions don't each auto-wait
+                    try:
+                        async with content.expect_navigation(wait_until="load", timeout=NAVIGATE_LOAD_TIMEOUT_MS):
+                            await shell.evaluate(_SHELL_NAVIGATE_JS, action.url)
+                    except PlaywrightTimeoutError:
+                        logger.debug("load event not seen on active tab after navigate to %s", action.url)
+                self._invalidate_content_page()
                 return {"status": "success", "content": [{"text": f"Navigated to {action.url} via App API"}]}
             except Exception as e:
-                logger.error(f"Navigation via Shell API failed: {e}")
+                logger.error("Navigation via Shell API failed: %s", e)
                 return {"status": "error", "content": [{"text": f"Navigation failed: {e}"}]}
         
         # DO NOT fall back to page.goto() - that would destroy the shell!
@@ -313,11 +855,12 @@ class LocalChromiumBrowser(Browser):
 
     async def _async_new_tab(self, action: NewTabAction) -> Dict[str, Any]:
         """Override: Use Shell API to create a new tab."""
-        shell = await self._get_shell_page()
+        shell = await self._current_shell_page()
         if shell:
             logger.info("Using Shell API to create new tab")
             try:
-                await shell.evaluate("window.electron.tabs.create()")
+                await shell.evaluate(_SHELL_NEW_TAB_JS)
+                self._invalidate_content_page()
                 return {"status": "success", "content": [{"text": "Created new tab via App API"}]}
             except Exception as e:
                 return {"status": "error", "content": [{"text": f"Failed to create tab: {e}"}]}
@@ -325,10 +868,13 @@ class LocalChromiumBrowser(Browser):
 
     async def _async_switch_tab(self, action: SwitchTabAction) -> Dict[str, Any]:
         """Override: Use Shell API to switch tabs."""
-        shell = await self._get_shell_page()
+        if not _is_valid_tab_id(action.tab_id):
+            return {"status": "error", "content": [{"text": f"Invalid tab id: {action.tab_id!r}"}]}
+        shell = await self._current_shell_page()
         if shell:
             try:
-                await shell.evaluate(f"window.electron.tabs.switch('{action.tab_id}')")
+                await shell.evaluate(_SHELL_SWITCH_TAB_JS, action.tab_id)
+                self._invalidate_content_page()
                 return {"status": "success", "content": [{"text": f"Switched to tab {action.tab_id} via App API"}]}
             except Exception as e:
                 return {"status": "error", "content": [{"text": f"Failed to switch tab: {e}"}]}
@@ -336,11 +882,14 @@ class LocalChromiumBrowser(Browser):
 
     async def _async_close_tab(self, action: CloseTabAction) -> Dict[str, Any]:
         """Override: Use Shell API to close tabs."""
-        shell = await self._get_shell_page()
+        if action.tab_id is not None and not _is_valid_tab_id(action.tab_id):
+            return {"status": "error", "content": [{"text": f"Invalid tab id: {action.tab_id!r}"}]}
+        shell = await self._current_shell_page()
         if shell:
             try:
                 tab_id = action.tab_id or "active"
-                await shell.evaluate(f"window.electron.tabs.close('{tab_id}')")
+                await shell.evaluate(_SHELL_CLOSE_TAB_JS, tab_id)
+                self._invalidate_content_page()
                 return {"status": "success", "content": [{"text": f"Closed tab via App API"}]}
             except Exception as e:
                 return {"status": "error", "content": [{"text": f"Failed to close tab: {e}"}]}
@@ -350,11 +899,11 @@ class LocalChromiumBrowser(Browser):
     # CRITICAL: Never fall back to base class for content interactions!
 
     async def _async_click(self, action: ClickAction) -> Dict[str, Any]:
-        shell = await self._get_shell_page()
+        shell = await self._current_shell_page()
         if not shell:
             return {"status": "error", "content": [{"text": "Cannot click: Shell page not found. Ensure the Electron app is running."}]}
         
-        page = await self._get_active_content_page(shell)
+        page = await self._current_content_page(shell)
         if not page:
             return {"status": "error", "content": [{"text": "Cannot click: No active content page. Navigate to a website first using the navigate action."}]}
 
@@ -365,11 +914,11 @@ class LocalChromiumBrowser(Browser):
             return {"status": "error", "content": [{"text": f"Click failed: {str(e)}"}]}
 
     async def _async_type(self, action: TypeAction) -> Dict[str, Any]:
-        shell = await self._get_shell_page()
+        shell = await self._current_shell_page()
         if not shell:
             return {"status": "error", "content": [{"text": "Cannot type: Shell page not found. Ensure the Electron app is running."}]}
         
-        page = await self._get_active_content_page(shell)
+        page = await self._current_content_page(shell)
         if not page:
             return {"status": "error", "content": [{"text": "Cannot type: No active content page. Navigate to a website first using the navigate action."}]}
 
@@ -380,19 +929,20 @@ class LocalChromiumBrowser(Browser):
             return {"status": "error", "content": [{"text": f"Type failed: {str(e)}"}]}
 
     async def _async_evaluate(self, action: EvaluateAction) -> Dict[str, Any]:
-        shell = await self._get_shell_page()
+        shell = await self._current_shell_page()
         if not shell:
             return {"status": "error", "content": [{"text": "Cannot evaluate: Shell page not found."}]}
         
         timeout_s = float(os.getenv("STRANDS_EVALUATE_TIMEOUT", "8"))
 
         # Routing Logic for Evaluate
-        if "electron" in action.script.lower() and "window.electron" in action.script:
+        # The exact substring already implies the case-insensitive one; no lowercase copy needed
+        if "window.electron" in action.script:
             # Run on Shell for app control
             page = shell
         else:
             # Run on content page for website interaction
-            page = await self._get_active_content_page(shell)
+            page = await self._current_content_page(shell)
             if not page:
                 # For evaluate without electronAPI, we need a content page
                 return {"status": "error", "content": [{"text": "Cannot evaluate: No active content page. Navigate to a website first."}]}
@@ -407,21 +957,25 @@ class LocalChromiumBrowser(Browser):
 
     async def _async_screenshot(self, action: ScreenshotAction) -> Dict[str, Any]:
         """Take screenshot of active CONTENT page. Uses JPEG for speed."""
-        shell = await self._get_shell_page()
+        shell = await self._current_shell_page()
         if not shell:
             return {"status": "error", "content": [{"text": "Cannot screenshot: Shell page not found."}]}
 
-        page = await self._get_active_content_page(shell)
+        page = await self._current_content_page(shell)
         if not page:
             return {"status": "error", "content": [{"text": "Cannot screenshot: No active content page. Navigate to a website first."}]}
 
         try:
             config = load_screenshot_config()
             quality = action.quality if hasattr(action, "quality") and action.quality else config.jpeg_quality
+            # An explicit viewport clip spares Playwright from measuring the window when the size is known
+            viewport = page.viewport_size
+            clip = {"x": 0, "y": 0, "width": viewport["width"], "height": viewport["height"]} if viewport else None
             screenshot_bytes = await page.screenshot(
                 type="jpeg",
                 quality=quality,
                 full_page=False,
+                clip=clip,
                 timeout=5000,
             )
             processed_bytes, info = compress_image_bytes(
@@ -429,17 +983,15 @@ class LocalChromiumBrowser(Browser):
                 config,
                 jpeg_quality=quality,
             )
-            cache_path = cache_image_bytes(processed_bytes, config, prefix="browser")
+            # Only the compressed JPEG is needed from here on; the file write, cache write and the
+            # response all share that one buffer (the SDK's image source takes bytes, not a path)
+            del screenshot_bytes
+            # Disk writes run off the event loop so concurrent page actions are not stalled
+            cache_path = await asyncio.to_thread(cache_image_bytes, processed_bytes, config, prefix="browser")
 
             # Save to file if requested
             if action.path:
-                screenshots_dir = os.getenv("STRANDS_BROWSER_SCREENSHOTS_DIR", "screenshots")
-                os.makedirs(screenshots_dir, exist_ok=True)
-                path = os.path.join(screenshots_dir, action.path) if not os.path.isabs(action.path) else action.path
-                if not path.lower().endswith((".jpg", ".jpeg")):
-                    path = f"{os.path.splitext(path)[0]}.jpg"
-                with open(path, "wb") as f:
-                    f.write(processed_bytes)
+                await asyncio.to_thread(_save_screenshot, action.path, processed_bytes)
 
             content = []
             if info["fits"]:
@@ -459,5 +1011,5 @@ class LocalChromiumBrowser(Browser):
             content.append({"text": f"Screenshot ({round(info['bytes'] / 1024, 1)} KB)"})
             return {"status": "success", "content": content}
         except Exception as e:
-            logger.error(f"Screenshot failed: {e}")
+            logger.error("Screenshot failed: %s", e)
             return {"status": "error", "content": [{"text": f"Screenshot failed: {str(e)}"}]}
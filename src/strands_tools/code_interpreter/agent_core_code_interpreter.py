@@ -1,4 +1,5 @@
 import logging
+import shlex
 import uuid
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
@@ -299,8 +300,12 @@ class AgentCoreCodeInterpreter(CodeInterpreter):
                 "content": [{"text": f"Failed to initialize session '{session_name}': {str(e)}"}],
             }
 
-    def list_local_sessions(self) -> Dict[str, Any]:
-        """List all sessions created by this Bedrock AgentCoreplatform instance."""
+    def list_local_sessions(self, include_meta: bool = False) -> Dict[str, Any]:
+        """
+        List all sessions created by this Bedrock AgentCore platform instance.
+
+        The listing always includes each session's metadata, so include_meta changes nothing.
+        """
         sessions_info = []
         for name, info in self._sessions.items():
             sessions_info.append(
@@ -418,7 +423,13 @@ class AgentCoreCodeInterpreter(CodeInterpreter):
 
         logger.debug(f"Executing command in session '{session_name}'")
 
-        params = {"command": action.command}
+        command = action.command
+        if action.env:
+            # The sandbox API takes only a command line, so per-command variables go through env(1)
+            assignments = " ".join(shlex.quote(f"{key}={value}") for key, value in action.env.items())
+            command = f"env {assignments} sh -c {shlex.quote(command)}"
+
+        params = {"command": command}
         response = self._sessions[session_name].client.invoke("executeCommand", params)
 
         return self._create_tool_result(response)
@@ -13,6 +13,7 @@ from strands import tool
 
 from .models import (
     CodeInterpreterInput,
+    CopyFileAction,
     ExecuteCodeAction,
     ExecuteCommandAction,
     InitSessionAction,
@@ -84,6 +85,7 @@ class CodeInterpreter(ABC):
         - writeFiles: Create or update files in the sandbox
         - listFiles: Browse directory contents and file structures
         - removeFiles: Delete files from the sandbox environment
+        - copyFile: Copy a file to a new path inside the sandbox
 
         Common Usage Scenarios:
         ---------------------
@@ -167,7 +169,8 @@ class CodeInterpreter(ABC):
                 - WriteFilesAction: type="writeFiles", session_name, content (list of FileContent objects)
                 - ListFilesAction: type="listFiles", session_name, path
                 - RemoveFilesAction: type="removeFiles", session_name, paths (list)
-                - ListLocalSessionsAction: type="listLocalSessions"
+                - CopyFileAction: type="copyFile", session_name, source, destination
+                - ListLocalSessionsAction: type="listLocalSessions", include_meta (optional)
 
         Returns:
             Dict containing execution results in the format:
@@ -235,8 +238,12 @@ class CodeInterpreter(ABC):
 
         # Delegate to implementations
         if isinstance(action, InitSessionAction):
+            if action.session_names:
+                return self.init_sessions(action)
             return self.init_session(action)
         elif isinstance(action, ListLocalSessionsAction):
+            if action.include_meta:
+                return self.list_local_sessions(include_meta=True)
             return self.list_local_sessions()
         elif isinstance(action, ExecuteCodeAction):
             return self.execute_code(action)
@@ -250,6 +257,8 @@ class CodeInterpreter(ABC):
             return self.remove_files(action)
         elif isinstance(action, WriteFilesAction):
             return self.write_files(action)
+        elif isinstance(action, CopyFileAction):
+            return self.copy_file(action)
         else:
             return {"status": "error", "content": [{"text": f"Unknown action: {type(action)}"}]}
 
@@ -322,9 +331,21 @@ class CodeInterpreter(ABC):
         """Write files to a sandbox session."""
         ...
 
+    def copy_file(self, action: CopyFileAction) -> Dict[str, Any]:
+        """Copy a file within a sandbox session. Platforms without a native copy report it as unsupported."""
+        return {"status": "error", "content": [{"text": f"copyFile is not supported by {type(self).__name__}"}]}
+
+    def init_sessions(self, action: InitSessionAction) -> Dict[str, Any]:
+        """Initialize every session in action.session_names. Platforms with a cheaper bulk path override this."""
+        for name in dict.fromkeys(action.session_names or []):
+            result = self.init_session(action.model_copy(update={"session_name": name, "session_names": None}))
+            if result.get("status") != "success":
+                return result
+        return {"status": "success", "content": [{"text": f"Sessions initialized: {action.session_names}"}]}
+
     @abstractmethod
-    def list_local_sessions(self) -> Dict[str, Any]:
-        """List all sessions created by this platform instance."""
+    def list_local_sessions(self, include_meta: bool = False) -> Dict[str, Any]:
+        """List all sessions created by this platform instance, with their metadata if include_meta is set."""
         ...
 
     @abstractmethod
@@ -1,17 +1,22 @@
 import logging
 import subprocess
-import shutil
 import json
 import time
 import os
+import select
+import shlex
+import threading
+import weakref
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from strands import tool
 from .code_interpreter import CodeInterpreter
+from .local_code_interpreter import remove_path, copy_file
 from .models import (
     CodeInterpreterInput,
+    CopyFileAction,
     ExecuteCodeAction,
     ExecuteCommandAction,
     InitSessionAction,
@@ -25,6 +30,30 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# How long a positive "container is running" check is trusted before asking docker again (seconds)
+CONTAINER_CHECK_TTL = 2.0
+# Per-stream cap on output kept from one command; the rest is dropped while waiting for the end marker
+MAX_OUTPUT_BYTES = 1 << 20
+# Runtime options for the sandbox container: tini as PID 1 to reap exec'd children, a RAM-backed /tmp
+# instead of the overlay layer, resource caps, and raised fd limits for code that opens many files
+SANDBOX_RUN_ARGS = [
+    "--init",
+    "--tmpfs", "/tmp:rw,size=256m,mode=1777",
+    "-e", "TMPDIR=/tmp",
+    "--cpus", str(os.cpu_count() or 1),
+    "--memory", "4g",
+    "--pids-limit", "1024",
+    "--ulimit", "nofile=65536:65536",
+    "--security-opt", "no-new-privileges",
+]
+
+
+def _decode(data: bytes, truncated: bool = False) -> str:
+    """Decode captured container output, replacing invalid UTF-8."""
+    text = bytes(data[:MAX_OUTPUT_BYTES]).decode("utf-8", errors="replace")
+    return text + "\n[output truncated]" if truncated else text
+
+
 class DockerCodeInterpreter(CodeInterpreter):
     """
     A persistent, secure Docker-based implementation of CodeInterpreter.
@@ -32,11 +61,12 @@ class DockerCodeInterpreter(CodeInterpreter):
     Architecture:
     - Uses a single persistent Docker container (python:3.10-slim) as the sandbox.
     - Mounts a local workspace directory to /workspace in the container.
-    - Executes code via 'docker exec'.
+    - Executes code through one long-lived 'docker exec -i ... sh' channel; each call is
+      framed by a unique end marker instead of paying for a fresh 'docker exec'.
     - Provides isolation from host process and environment secrets.
     """
     
-    def __init__(self, workspace_dir: Optional[str] = None):
+    def __init__(self, workspace_dir: Optional[str] = None, network_disabled: bool = False):
         super().__init__()
         # Use a fixed container name for persistence across agent restarts, 
         # or uuid for unique per-run session. Let's use fixed to allow re-attaching.
@@ -45,15 +75,36 @@ class DockerCodeInterpreter(CodeInterpreter):
         
         self.workspace_dir = Path(workspace_dir) if workspace_dir else Path(os.getcwd()) / "workspace"
         self.workspace_dir.mkdir(parents=True, exist_ok=True)
+        # Resolved once; file helpers join plain strings onto it instead of building Path objects
+        self._workspace_str = os.fspath(self.workspace_dir.resolve())
+        # Workspace directory opened once; file helpers open relative to it so the kernel does not
+        # re-walk the workspace prefix on every call
+        self._workspace_fd = os.open(self._workspace_str, os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+        weakref.finalize(self, os.close, self._workspace_fd)
+        # Run the container with no network at all: no bridge/veth setup, and sandboxed code stays offline
+        self.network_disabled = network_disabled
         
         # Ensure we have a default session
         self._default_session = "default"
         self._sessions = {self._default_session: {"cwd": "/workspace"}}
 
+        # Persistent shell inside the container, started on first use and restarted if it exits
+        self._shell: Optional[subprocess.Popen] = None
+        self._shell_lock = threading.Lock()
+        # Monotonic deadline until which the container is assumed running without a docker inspect
+        self._running_cached_until = 0.0
+
     def start_platform(self) -> None:
         """Ensure Docker container is running."""
+        shell = self._shell
+        if shell is not None and shell.poll() is None:
+            # A live exec shell means the container is up; no docker call needed
+            return
+        if time.monotonic() < self._running_cached_until:
+            return
         if self._is_container_running():
             logger.info(f"Container {self.container_name} already running.")
+            self._running_cached_until = time.monotonic() + CONTAINER_CHECK_TTL
             return
 
         # Remove if exists but stopped
@@ -65,8 +116,10 @@ class DockerCodeInterpreter(CodeInterpreter):
             subprocess.run([
                 "docker", "run", "-d",
                 "--name", self.container_name,
-                "-v", f"{self.workspace_dir.absolute()}:/workspace",
+                "-v", f"{self._workspace_str}:/workspace",
                 "-w", "/workspace",
+                *SANDBOX_RUN_ARGS,
+                *(["--network=none"] if self.network_disabled else []),
                 self.image,
                 "tail", "-f", "/dev/null"
             ], check=True, capture_output=True)
@@ -75,7 +128,9 @@ class DockerCodeInterpreter(CodeInterpreter):
             # subprocess.run(["docker", "exec", self.container_name, "pip", "install", "numpy", "pandas"], capture_output=True)
             
             logger.info("Sandbox container started.")
+            self._running_cached_until = time.monotonic() + CONTAINER_CHECK_TTL
         except subprocess.CalledProcessError as e:
+            self._running_cached_until = 0.0
             logger.error(f"Failed to start docker container: {e.stderr.decode()}")
             raise RuntimeError("Docker is required but failed to start container. Is Docker running?")
 
@@ -83,8 +138,119 @@ class DockerCodeInterpreter(CodeInterpreter):
         """Stop the container (optional - maybe we want it persistent?)."""
         # For a "browser OS", we might want to keep it running. 
         # But to be clean, let's leave it. The user can kill it.
-        # pass
-        pass
+        # Only the shell channel into it is closed.
+        with self._shell_lock:
+            self._close_shell()
+
+    def _ensure_shell(self) -> subprocess.Popen:
+        """Return the persistent shell in the container, starting a new one if it has exited."""
+        if self._shell is None or self._shell.poll() is not None:
+            self._close_shell()
+            self._shell = subprocess.Popen(
+                ["docker", "exec", "-i", "-w", "/workspace", self.container_name, "sh"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=0,
+            )
+        return self._shell
+
+    def _close_shell(self) -> None:
+        """Kill the persistent shell (if any) and release its pipes."""
+        shell, self._shell = self._shell, None
+        if shell is None:
+            return
+        # The shell may have died with the container; check again on the next start_platform
+        self._running_cached_until = 0.0
+        if shell.poll() is None:
+            shell.kill()
+        shell.wait()
+        for pipe in (shell.stdin, shell.stdout, shell.stderr):
+            if pipe:
+                pipe.close()
+
+    def _run_in_shell(self, command: str, timeout: float) -> Tuple[Optional[int], str, str]:
+        """
+        Run one command line through the persistent shell.
+
+        The command's stdin is /dev/null so it cannot consume the channel. After it, the
+        shell echoes a per-call marker with the exit code to stdout and the bare marker to
+        stderr; output is read from both pipes until both markers arrive.
+
+        Each stream keeps at most MAX_OUTPUT_BYTES; past that only a short tail is held so
+        the marker can still be spotted, and the output is flagged as truncated.
+
+        Returns:
+            (exit code, stdout, stderr). The exit code is None if the command timed out, in
+            which case the shell is killed and replaced on the next call.
+        """
+        marker = f"__RON_END_{uuid4().hex}__".encode()
+        script = f'{{ {command}\n}} </dev/null\necho "{marker.decode()}$?"\necho "{marker.decode()}" >&2\n'.encode()
+
+        with self._shell_lock:
+            shell = self._ensure_shell()
+            try:
+                shell.stdin.write(script)
+            except BrokenPipeError:
+                # The shell died since the liveness check (e.g. container restarted); retry once
+                self._close_shell()
+                shell = self._ensure_shell()
+                shell.stdin.write(script)
+
+            out_fd, err_fd = shell.stdout.fileno(), shell.stderr.fileno()
+            buffers = {out_fd: bytearray(), err_fd: bytearray()}
+            # Where the next marker search starts, so each byte is scanned about once
+            scan_from = {out_fd: 0, err_fd: 0}
+            truncated = {out_fd: False, err_fd: False}
+            # Enough trailing bytes to hold the marker line ("<marker><exit code>\n")
+            tail = len(marker) + 16
+            open_fds = list(buffers)
+            exit_code: Optional[int] = None
+            deadline = time.monotonic() + timeout
+
+            def result(code: Optional[int]) -> Tuple[Optional[int], str, str]:
+                return (
+                    code,
+                    _decode(buffers[out_fd], truncated[out_fd]),
+                    _decode(buffers[err_fd], truncated[err_fd]),
+                )
+
+            while open_fds:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._close_shell()
+                    return result(None)
+                ready, _, _ = select.select(open_fds, [], [], remaining)
+                for fd in ready:
+                    chunk = os.read(fd, 65536)
+                    if not chunk:
+                        # Shell exited before finishing the frame
+                        open_fds.remove(fd)
+                        continue
+                    buffer = buffers[fd]
+                    buffer.extend(chunk)
+                    index = buffer.find(marker, scan_from[fd])
+                    if index == -1:
+                        if len(buffer) > MAX_OUTPUT_BYTES + tail:
+                            # Over the cap: keep the head for the caller and the tail for the marker
+                            del buffer[MAX_OUTPUT_BYTES : len(buffer) - tail]
+                            truncated[fd] = True
+                        scan_from[fd] = max(0, len(buffer) - len(marker) + 1)
+                        continue
+                    scan_from[fd] = index
+                    if fd == out_fd:
+                        line_end = buffer.find(b"\n", index)
+                        if line_end == -1:
+                            continue
+                        exit_code = int(buffer[index + len(marker) : line_end])
+                    del buffer[index:]
+                    open_fds.remove(fd)
+
+            if exit_code is None:
+                # EOF without the marker: the shell is gone, report whatever it left behind
+                self._close_shell()
+                exit_code = -1
+            return result(exit_code)
 
     def _is_container_running(self) -> bool:
         """Check if container is running."""
@@ -104,7 +270,17 @@ class DockerCodeInterpreter(CodeInterpreter):
         self.start_platform() # Ensure running
         return {"status": "success", "content": [{"text": f"Session '{session_name}' initialized in Docker container."}]}
 
-    def list_local_sessions(self) -> Dict[str, Any]:
+    def init_sessions(self, action: InitSessionAction) -> Dict[str, Any]:
+        """Initialize several sessions with one container check; existing sessions are left untouched."""
+        new = [name for name in dict.fromkeys(action.session_names or []) if name not in self._sessions]
+        self._sessions.update({name: {"cwd": "/workspace"} for name in new})
+        self.start_platform()
+        return {"status": "success", "content": [{"text": f"Sessions initialized in Docker container: {new}"}]}
+
+    def list_local_sessions(self, include_meta: bool = False) -> Dict[str, Any]:
+        if include_meta:
+            sessions = {name: dict(meta) for name, meta in self._sessions.items()}
+            return {"status": "success", "content": [{"json": sessions}]}
         return {"status": "success", "content": [{"json": list(self._sessions.keys())}]}
 
     def execute_code(self, action: ExecuteCodeAction) -> Dict[str, Any]:
@@ -114,56 +290,57 @@ class DockerCodeInterpreter(CodeInterpreter):
         
         self.start_platform()
 
-        # We wrap the user's code to capture stdout/stderr properly inside the container
-        # escaping quotes is tricky. Easiest is to write a temp file to workspace and exec it.
-        
-        code_filename = f"_exec_{uuid4().hex}.py"
-        code_path = self.workspace_dir / code_filename
-        
-        with open(code_path, "w") as f:
-            f.write(action.code)
-            
-        # Execute in container
-        # Note: file is mounted at /workspace/<filename>
-        cmd = ["docker", "exec", "-w", "/workspace", self.container_name, "python3", code_filename]
-        
+        # Feed the code to python3 on stdin through a quoted heredoc: no temp file on the
+        # workspace mount, and the quoted delimiter turns off all shell expansion in the body
+        lines = action.code.splitlines()
+        delimiter = f"__RON_EOF_{uuid4().hex}__"
+        while delimiter in lines:
+            delimiter = f"__RON_EOF_{uuid4().hex}__"
+        command = f"python3 -u - <<'{delimiter}'\n{action.code}\n{delimiter}"
+
         try:
-            res = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-            
-            output = ""
-            if res.stdout: output += f"STDOUT:\n{res.stdout}\n"
-            if res.stderr: output += f"STDERR:\n{res.stderr}\n"
-            if not output: output = "Code executed (no output)."
-            
-            status = "success" if res.returncode == 0 else "error"
-            
-        except subprocess.TimeoutExpired:
-            status = "error"
-            output = "Execution timed out (120s limit)."
+            returncode, stdout, stderr = self._run_in_shell(command, timeout=120)
+            if returncode is None:
+                status = "error"
+                output = "Execution timed out (120s limit)."
+            else:
+                output = ""
+                if stdout:
+                    output += f"STDOUT:\n{stdout}\n"
+                if stderr:
+                    output += f"STDERR:\n{stderr}\n"
+                if not output:
+                    output = "Code executed (no output)."
+
+                status = "success" if returncode == 0 else "error"
+
         except Exception as e:
             status = "error"
             output = str(e)
-        finally:
-            # Cleanup temp file
-            if code_path.exists():
-                code_path.unlink()
 
         return {"status": status, "content": [{"text": output}]}
 
     def execute_command(self, action: ExecuteCommandAction) -> Dict[str, Any]:
         self.start_platform()
         
-        # Execute via shell in docker
-        cmd = ["docker", "exec", "-w", "/workspace", self.container_name, "sh", "-c", action.command]
-        
+        # Execute via a child sh in the container so cd/exit/syntax errors stay out of the channel;
+        # per-command variables go through env(1) on the resident exec shell, not a new docker exec
+        command = f"sh -c {shlex.quote(action.command)}"
+        if action.env:
+            assignments = " ".join(shlex.quote(f"{key}={value}") for key, value in action.env.items())
+            command = f"env {assignments} {command}"
         try:
-            res = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            returncode, stdout, stderr = self._run_in_shell(command, timeout=60)
+            if returncode is None:
+                return {"status": "error", "content": [{"text": "Command timed out (60s limit)."}]}
             output = ""
-            if res.stdout: output += f"STDOUT:\n{res.stdout}\n"
-            if res.stderr: output += f"STDERR:\n{res.stderr}\n"
+            if stdout:
+                output += f"STDOUT:\n{stdout}\n"
+            if stderr:
+                output += f"STDERR:\n{stderr}\n"
             
             return {
-                "status": "success" if res.returncode == 0 else "error",
+                "status": "success" if returncode == 0 else "error",
                 "content": [{"text": output or "Command executed."}]
             }
         except Exception as e:
@@ -185,36 +362,86 @@ class DockerCodeInterpreter(CodeInterpreter):
         # Remove locally
         return self._local_remove_files(action)
 
+    def copy_file(self, action: CopyFileAction) -> Dict[str, Any]:
+        # Copy on the host side of the bind mount, where a reflink or in-kernel copy is possible
+        src_path, dst_path = self._workspace_path(action.source), self._workspace_path(action.destination)
+        if src_path is None or dst_path is None:
+            return {"status": "error", "content": [{"text": "Path is outside the workspace"}]}
+        try:
+            os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+            copy_file(src_path, dst_path)
+        except FileNotFoundError:
+            return {"status": "error", "content": [{"text": f"File not found: {action.source}"}]}
+        except Exception as e:
+            return {"status": "error", "content": [{"text": f"Error copying {action.source}: {e}"}]}
+        return {"status": "success", "content": [{"text": f"Copied {action.source} to {action.destination}"}]}
+
     # --- Local File Ops Helper Methods (reused from LocalCodeInterpreter somewhat) ---
     # Since workspace is mounted, we perform file ops directly on host for speed/simplicity
     # This assumes the user (agent) has permission to read/write the mounted dir.
     
+    def _workspace_path(self, relative: str) -> Optional[str]:
+        """Join a sandbox path onto the workspace; None if it would land outside the workspace."""
+        full = os.path.normpath(os.path.join(self._workspace_str, relative))
+        if os.path.commonpath([full, self._workspace_str]) != self._workspace_str:
+            return None
+        return full
+
+    def _open_in_workspace(self, full: str, flags: int) -> int:
+        """os.open a path returned by _workspace_path, relative to the registered workspace fd."""
+        relative = full[len(self._workspace_str):].lstrip(os.sep) or "."
+        return os.open(relative, flags | os.O_CLOEXEC, 0o666, dir_fd=self._workspace_fd)
+
     def _local_list_files(self, action):
-        target = self.workspace_dir / (action.path or ".")
-        if not target.exists(): return {"status": "error", "content": [{"text": "Path not found"}]}
-        return {"status": "success", "content": [{"json": [f.name for f in target.iterdir()]}]}
+        target = self._workspace_path(action.path or ".")
+        if target is None:
+            return {"status": "error", "content": [{"text": "Path is outside the workspace"}]}
+        try:
+            with os.scandir(target) as entries:
+                names = [entry.name for entry in entries]
+        except FileNotFoundError:
+            return {"status": "error", "content": [{"text": "Path not found"}]}
+        return {"status": "success", "content": [{"json": names}]}
         
     def _local_read_files(self, action):
         res = {}
         for p in action.paths:
-            path = self.workspace_dir / p
-            if path.exists() and path.is_file():
-                with open(path, 'r') as f: res[p] = f.read()
+            path = self._workspace_path(p)
+            if path is None:
+                continue
+            try:
+                with open(self._open_in_workspace(path, os.O_RDONLY), "rb") as f:
+                    res[p] = f.read().decode("utf-8", errors="replace")
+            except (FileNotFoundError, IsADirectoryError):
+                continue
         return {"status": "success", "content": [{"json": res}]}
         
     def _local_write_files(self, action):
+        outside = [item.path for item in action.content if self._workspace_path(item.path) is None]
+        if outside:
+            return {"status": "error", "content": [{"text": f"Paths outside the workspace: {outside}"}]}
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
         for item in action.content:
-            path = self.workspace_dir / item.path
-            path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, 'w') as f: f.write(item.text)
+            path = self._workspace_path(item.path)
+            try:
+                fd = self._open_in_workspace(path, flags)
+            except FileNotFoundError:
+                # Parent directory missing: create it only on this slow path
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd = self._open_in_workspace(path, flags)
+            with open(fd, "wb") as f:
+                f.write(item.text.encode("utf-8"))
         return {"status": "success", "content": [{"text": f"Written {len(action.content)} files"}]}
         
     def _local_remove_files(self, action):
         deleted = []
         for p in action.paths:
-            path = self.workspace_dir / p
-            if path.exists():
-                if path.is_file(): path.unlink()
-                else: shutil.rmtree(path)
-                deleted.append(p)
+            path = self._workspace_path(p)
+            if path is None or path == self._workspace_str:
+                continue
+            try:
+                remove_path(path)
+            except FileNotFoundError:
+                continue
+            deleted.append(p)
         return {"status": "success", "content": [{"text": f"Deleted {deleted}"}]}
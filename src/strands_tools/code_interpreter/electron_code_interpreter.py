@@ -1,9 +1,19 @@
-import logging
+import asyncio
+import base64
 import json
-import ast
-from typing import Any, Dict, List, Optional
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
 
 from strands import tool
+
+from ..browser.browser import Browser
+from ..browser.models import BrowserInput, EvaluateAction
 from .code_interpreter import CodeInterpreter
 from .models import (
     CodeInterpreterInput,
@@ -11,21 +21,178 @@ from .models import (
     InitSessionAction,
     LanguageType,
 )
-from ..browser.browser import Browser
-from ..browser.models import BrowserInput, EvaluateAction
 
 logger = logging.getLogger(__name__)
 
+# File ops run as one Python script per batch; the script prints its JSON result between these markers,
+# with "<" escaped in the JSON so file contents can never contain a marker
+_RESULT_START = "<<RON_RESULT>>"
+_RESULT_END = "<<RON_END>>"
+_RESULT_PATTERN = re.compile(re.escape(_RESULT_START) + r"(.*?)" + re.escape(_RESULT_END), re.DOTALL)
+
+_READ_FILES_SCRIPT = """import json, os
+results, errors = {}, []
+for p in json.loads(%r):
+    try:
+        if os.path.isfile(p):
+            with open(p, encoding="utf-8", errors="replace") as f:
+                results[p] = f.read()
+        else:
+            errors.append("File not found: " + p)
+    except Exception as e:
+        errors.append("Error reading %%s: %%s" %% (p, e))
+print(%r + json.dumps({"results": results, "errors": errors}).replace("<", "\\\\u003c") + %r)
+"""
+
+# File contents travel base64-encoded: 4/3 size for any text, instead of a \uXXXX escape per non-ASCII char
+_WRITE_FILES_SCRIPT = """import base64, json, os
+written, errors = 0, []
+for p, data in json.loads(%r):
+    try:
+        parent = os.path.dirname(p)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with open(p, "wb") as f:
+            f.write(base64.b64decode(data))
+        written += 1
+    except Exception as e:
+        errors.append("Error writing %%s: %%s" %% (p, e))
+print(%r + json.dumps({"written": written, "errors": errors}).replace("<", "\\\\u003c") + %r)
+"""
+
+_REMOVE_FILES_SCRIPT = """import json, os, shutil
+deleted, errors = [], []
+for p in json.loads(%r):
+    try:
+        if os.path.isdir(p) and not os.path.islink(p):
+            shutil.rmtree(p)
+        else:
+            os.remove(p)
+        deleted.append(p)
+    except Exception as e:
+        errors.append("Error removing %%s: %%s" %% (p, e))
+print(%r + json.dumps({"deleted": deleted, "errors": errors}).replace("<", "\\\\u003c") + %r)
+"""
+
+_EXECUTE_COMMAND_SCRIPT = """import json, os, subprocess
+argv, env = json.loads(%r)
+try:
+    r = subprocess.run(argv, env={**os.environ, **env} if env else None, capture_output=True, timeout=60)
+    out = {
+        "rc": r.returncode,
+        "stdout": r.stdout.decode("utf-8", "replace"),
+        "stderr": r.stderr.decode("utf-8", "replace"),
+    }
+except subprocess.TimeoutExpired:
+    out = {"rc": None, "stdout": "", "stderr": ""}
+print(%r + json.dumps(out).replace("<", "\\\\u003c") + %r)
+"""
+
+_LIST_FILES_SCRIPT = """import json, os
+try:
+    out = {"files": os.listdir(json.loads(%r)), "error": None}
+except FileNotFoundError:
+    out = {"files": [], "error": "Path not found"}
+except Exception as e:
+    out = {"files": [], "error": str(e)}
+print(%r + json.dumps(out).replace("<", "\\\\u003c") + %r)
+"""
+
+
+# The browser caps each evaluate (LocalChromiumBrowser: STRANDS_EVALUATE_TIMEOUT), so a batch stops
+# starting queued calls once this many ms have passed in the page; the rest go in the next evaluate,
+# and a call coalesced behind slow ones is not cut off by the cap
+BATCH_TIME_BUDGET_MS = int(os.getenv("STRANDS_ELECTRON_BATCH_BUDGET_MS", "1000"))
+# How long a caller waits for its call to come back across the bridge (seconds)
+BRIDGE_TIMEOUT = float(os.getenv("STRANDS_ELECTRON_BRIDGE_TIMEOUT", "120"))
+
+# Runs a prefix of a batch of tool calls sequentially in one evaluate (at least one call, then more
+# while within the time budget); a failing call is reported in place with the ExecutionResult failure
+# shape instead of rejecting the whole batch
+_EXECUTE_BATCH_JS = """(async () => {
+    const results = [];
+    const deadline = Date.now() + %d;
+    for (const args of %s) {
+        if (results.length && Date.now() >= deadline) {
+            break;
+        }
+        try {
+            results.push(await window.electronAPI.tools.execute(%s, args));
+        } catch (e) {
+            results.push({ success: false, error: String(e) });
+        }
+    }
+    return JSON.stringify(results);
+})()"""
+
+
+def _format_execution_result(execution_result: Any) -> Dict[str, Any]:
+    """Convert one Electron ExecutionResult into a code interpreter result."""
+    if not isinstance(execution_result, dict):
+        return {"status": "error", "content": [{"text": f"Unexpected result format: {json.dumps(execution_result)}"}]}
+
+    # ExecutionResult structure from Electron:
+    # { success, result: { status, content }, stdout, stderr, ... }
+    if not execution_result.get("success"):
+        error_msg = execution_result.get("error", "Unknown Electron error")
+        return {"status": "error", "content": [{"text": f"Electron execution failed: {error_msg}"}]}
+
+    inner_result = execution_result.get("result", {})
+    # Add stdout/stderr to content for visibility
+    stdout = execution_result.get("stdout", "")
+    stderr = execution_result.get("stderr", "")
+
+    final_content = []
+    if inner_result.get("content"):
+        final_content.extend(inner_result["content"])
+    else:
+        final_content.append({"text": "No content returned."})
+
+    if stdout:
+        final_content.append({"text": f"\nSTDOUT:\n{stdout}"})
+    if stderr:
+        final_content.append({"text": f"\nSTDERR:\n{stderr}"})
+
+    return {
+        "status": inner_result.get("status", "success"),
+        "content": final_content
+    }
+
+
+def _claim(future: Future) -> bool:
+    """Mark a queued call's future as running; False if its caller already cancelled it."""
+    return future.running() or future.set_running_or_notify_cancel()
+
+
 class ElectronCodeInterpreter(CodeInterpreter):
     """
     Code Interpreter implementation that bridges to Electron's UtilityProcess
     via the Browser connection (using window.electronAPI.tools.execute).
     """
     
-    def __init__(self, browser: Browser):
+    def __init__(self, browser: Browser, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Args:
+            browser: Browser connected to the Electron app.
+            loop: Event loop the browser runs on; defaults to the loop running when this is created, if
+                any. Tool calls arrive on worker threads and run the browser's evaluate on that loop.
+        """
         super().__init__()
         self.browser_tool = browser
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+        self._loop = loop
         self._default_session = "default"
+        # Calls waiting to cross the bridge; whoever finds no flush in flight sends them as one batch
+        self._pending: List[Tuple[Future, Dict[str, Any]]] = []
+        self._pending_lock = threading.Lock()
+        # Notified whenever queued calls get results or the flush is handed to _next_leader's caller
+        self._pending_ready = threading.Condition(self._pending_lock)
+        self._flushing = False
+        self._next_leader: Optional[Future] = None
 
     def start_platform(self) -> None:
         pass
@@ -39,117 +206,234 @@ class ElectronCodeInterpreter(CodeInterpreter):
     def init_session(self, action: InitSessionAction) -> Dict[str, Any]:
         return {"status": "success", "content": [{"text": "Session initialization delegated to Electron."}]}
 
-    def list_local_sessions(self) -> Dict[str, Any]:
+    def list_local_sessions(self, include_meta: bool = False) -> Dict[str, Any]:
+        if include_meta:
+            return {"status": "success", "content": [{"json": {"default": {}}}]}
         return {"status": "success", "content": [{"json": ["default"]}]}
 
     def execute_code(self, action: ExecuteCodeAction) -> Dict[str, Any]:
         if action.language != LanguageType.PYTHON:
             return {"status": "error", "content": [{"text": f"Language {action.language} not supported."}]}
 
-        # Construct the JavaScript call to execute the tool
-        # tool name matches the function name in code_interpreter_wrapper.py
-        tool_name = "code_interpreter"
-        args = {"code": action.code}
-        
-        # Serialize args for JS
-        args_json = json.dumps(args)
-        
-        script = f"window.electronAPI.tools.execute('{tool_name}', {args_json})"
-        
+        future: Future = Future()
+        deadline = time.monotonic() + BRIDGE_TIMEOUT
+        with self._pending_lock:
+            self._pending.append((future, {"code": action.code}))
+            lead = not self._flushing
+            self._flushing = True
+        while True:
+            if lead:
+                # This caller sends batches, including calls queued meanwhile, until its own call has a result
+                self._drain_pending(future)
+            with self._pending_ready:
+                while not future.done() and self._next_leader is not future:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._pending_ready.wait(remaining)
+                lead = self._next_leader is future
+                if lead:
+                    self._next_leader = None
+                    if time.monotonic() < deadline:
+                        continue
+                    # Out of time before taking over: pass the flush on instead
+                    future.cancel()
+                    self._hand_off()
+            if future.done() and not future.cancelled():
+                return future.result()
+            # Drops the call if it has not been sent yet
+            future.cancel()
+            error = f"Electron bridge gave no result within {BRIDGE_TIMEOUT:g}s"
+            return {"status": "error", "content": [{"text": error}]}
+
+    def _hand_off(self) -> None:
+        """Pass the flush to the first queued caller still waiting, or end it. Call with the pending lock held."""
+        for future, _ in self._pending:
+            if not future.done():
+                self._next_leader = future
+                self._pending_ready.notify_all()
+                return
+        # Only calls whose callers gave up are left
+        self._pending = []
+        self._flushing = False
+
+    def _drain_pending(self, own: Future) -> None:
+        """
+        Send queued calls across the bridge, one batch per round trip, until own has a result.
+
+        The leader then hands the flush to a queued caller, so no caller serves other callers' work
+        for longer than its own call takes.
+        """
+        batch: List[Tuple[Future, Dict[str, Any]]] = []
+        handed_off = False
         try:
-            # Execute via Browser Tool
-            # We assume the browser is connected to the Electron App (CDP 9222)
-            result = self.browser_tool.evaluate(EvaluateAction(
-                type="evaluate",
-                script=script,
-                session_name="main" # Assuming 'main' is the default session in browser
-            ))
-            
-            # Result content[0].text is "Evaluation result: {JSON}"
-            text_result = result["content"][0]["text"]
-            prefix = "Evaluation result: "
-            if text_result.startswith(prefix):
-                raw_json = text_result[len(prefix):]
-                
-                # The raw_json is a string representation of the JS object returned by execute()
-                # We need to parse it. 
-                # If it's a Python dict string (single quotes), we might need literal_eval or json fix.
-                # However, LocalChromiumBrowser.evaluate uses standard primitive returns.
-                # If window.electronAPI returns an Object, Playwright returns a Dict.
-                
+            while True:
+                with self._pending_lock:
+                    if own.done() or not self._pending:
+                        self._hand_off()
+                        handed_off = True
+                        return
+                    batch, self._pending = self._pending, []
+                # Skip calls whose caller gave up waiting before they were sent
+                batch = [(future, args) for future, args in batch if _claim(future)]
                 try:
-                    # Attempt to parse as JSON first (if strictly JSON)
-                    # But Python's str(dict) uses single quotes.
-                    # Use ast.literal_eval for safety if it looks like a python dict string
-                    if raw_json.startswith("{"):
-                        execution_result = ast.literal_eval(raw_json)
-                    else:
-                         return {"status": "error", "content": [{"text": f"Unexpected result format: {raw_json}"}]}
-                    
-                    # ExecutionResult structure from Electron:
-                    # { success, result: { status, content }, stdout, stderr, ... }
-                    
-                    if not execution_result.get("success"):
-                        error_msg = execution_result.get("error", "Unknown Electron error")
-                        return {"status": "error", "content": [{"text": f"Electron execution failed: {error_msg}"}]}
-                        
-                    inner_result = execution_result.get("result", {})
-                    # Add stdout/stderr to content for visibility
-                    stdout = execution_result.get("stdout", "")
-                    stderr = execution_result.get("stderr", "")
-                    
-                    final_content = []
-                    if inner_result.get("content"):
-                         final_content.extend(inner_result["content"])
-                    else:
-                         final_content.append({"text": "No content returned."})
-                         
-                    if stdout: final_content.append({"text": f"\nSTDOUT:\n{stdout}"})
-                    if stderr: final_content.append({"text": f"\nSTDERR:\n{stderr}"})
-                    
-                    return {
-                        "status": inner_result.get("status", "success"),
-                        "content": final_content
-                    }
-
+                    results = self._execute_batch([args for _, args in batch])
                 except Exception as e:
-                    return {"status": "error", "content": [{"text": f"Failed to parse Electron result: {e}\nRaw: {raw_json}"}]}
-                    
-            else:
-                 return {"status": "error", "content": [{"text": f"Unexpected browser output: {text_result}"}]}
-                 
+                    logger.error(f"ElectronCodeInterpreter error: {e}")
+                    results = [{"status": "error", "content": [{"text": f"Bridge error: {str(e)}"}]}] * len(batch)
+                for (future, _), result in zip(batch[: len(results)], results, strict=True):
+                    future.set_result(result)
+                # Calls the page did not start within its time budget go first in the next round trip
+                batch = batch[len(results):]
+                with self._pending_ready:
+                    self._pending[:0] = batch
+                    self._pending_ready.notify_all()
+                batch = []
+        finally:
+            if not handed_off:
+                # The leader was interrupted (e.g. KeyboardInterrupt): fail every call it was holding so no
+                # waiter is left behind, and let the next caller lead
+                with self._pending_lock:
+                    stranded, self._pending = batch + self._pending, []
+                    self._flushing = False
+                    self._next_leader = None
+                error = {"status": "error", "content": [{"text": "Bridge error: flush interrupted"}]}
+                for future, _ in stranded:
+                    if not future.done() and _claim(future):
+                        future.set_result(error)
+                with self._pending_ready:
+                    self._pending_ready.notify_all()
+
+    def _evaluate(self, script: str) -> Dict[str, Any]:
+        """Run the browser's async evaluate to completion from this (worker) thread."""
+        # We assume the browser is connected to the Electron App (CDP 9222)
+        coro = self.browser_tool.evaluate(EvaluateAction(
+            type="evaluate",
+            script=script,
+            session_name="main" # Assuming 'main' is the default session in browser
+        ))
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            # Blocking here would stall the loop the evaluate needs
+            coro.close()
+            raise RuntimeError("ElectronCodeInterpreter must be called from a worker thread, not an event loop")
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            # No browser loop to hand off to: run on a private one
+            return asyncio.run(coro)
+        pending = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return pending.result(timeout=BRIDGE_TIMEOUT)
+        except FutureTimeoutError as e:
+            pending.cancel()
+            raise RuntimeError(f"browser evaluate did not finish within {BRIDGE_TIMEOUT:g}s") from e
+
+    def _execute_batch(self, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run queued tool calls in order inside a single CDP evaluate and format each result.
+
+        The page may stop after a prefix of the calls (see BATCH_TIME_BUDGET_MS); only that
+        prefix's results are returned.
+        """
+        # tool name matches the function name in code_interpreter_wrapper.py
+        script = _EXECUTE_BATCH_JS % (BATCH_TIME_BUDGET_MS, json.dumps(calls), json.dumps("code_interpreter"))
+        result = self._evaluate(script)
+
+        # Result content[0].text is "Evaluation result: [{JSON}, ...]"
+        text_result = result["content"][0]["text"]
+        prefix = "Evaluation result: "
+        if not text_result.startswith(prefix):
+            error = {"status": "error", "content": [{"text": f"Unexpected browser output: {text_result}"}]}
+            return [error] * len(calls)
+
+        raw_json = text_result[len(prefix):]
+        try:
+            execution_results = json.loads(raw_json)
         except Exception as e:
-            logger.error(f"ElectronCodeInterpreter error: {e}")
-            return {"status": "error", "content": [{"text": f"Bridge error: {str(e)}"}]}
+            error = {"status": "error", "content": [{"text": f"Failed to parse Electron result: {e}\nRaw: {raw_json}"}]}
+            return [error] * len(calls)
+        if not isinstance(execution_results, list) or not 0 < len(execution_results) <= len(calls):
+            return [{"status": "error", "content": [{"text": f"Unexpected result format: {raw_json}"}]}] * len(calls)
+        return [_format_execution_result(execution_result) for execution_result in execution_results]
 
     # Other methods (file ops) not strictly required if code execution can do it
     # But strictly adhering to interface:
     def execute_command(self, action):
-        # We can run commands via Python subprocess inside the code capability
-        code = f"import subprocess\nsubprocess.run('{action.command}', shell=True, check=True)"
-        return self.execute_code(ExecuteCodeAction(code=code, language=LanguageType.PYTHON))
+        # Run the command through Python subprocess inside the code capability, passing sh its argv as JSON
+        result = self._run_file_script(_EXECUTE_COMMAND_SCRIPT, [["/bin/sh", "-c", action.command], action.env])
+        if "json" not in result:
+            return result
+        data = result["json"]
+        if data["rc"] is None:
+            return {"status": "error", "content": [{"text": "Command timed out (60s limit)."}]}
+        output = ""
+        if data["stdout"]:
+            output += f"STDOUT:\n{data['stdout']}\n"
+        if data["stderr"]:
+            output += f"STDERR:\n{data['stderr']}\n"
+        return {
+            "status": "success" if data["rc"] == 0 else "error",
+            "content": [{"text": output or "Command executed (no output)."}],
+        }
 
     def list_files(self, action):
-        code = f"import os\nprint(os.listdir('{action.path or '.'}'))"
-        return self.execute_code(ExecuteCodeAction(code=code, language=LanguageType.PYTHON))
+        result = self._run_file_script(_LIST_FILES_SCRIPT, action.path or ".")
+        if "json" not in result:
+            return result
+        data = result["json"]
+        if data["error"]:
+            return {"status": "error", "content": [{"text": data["error"]}]}
+        return {"status": "success", "content": [{"json": data["files"]}]}
+
+    def _run_file_script(self, template: str, payload: Any) -> Dict[str, Any]:
+        """
+        Run a batched file-op script in one bridge call and return its JSON result.
+
+        The payload is embedded as a JSON string literal, so paths and file contents
+        need no escaping. Returns the execute_code result unchanged if the script
+        fails or prints no marked result.
+        """
+        code = template % (json.dumps(payload), _RESULT_START, _RESULT_END)
+        result = self.execute_code(ExecuteCodeAction(type="executeCode", code=code, language=LanguageType.PYTHON))
+        if result["status"] != "success":
+            return result
+        for item in result["content"]:
+            match = _RESULT_PATTERN.search(item.get("text", ""))
+            if match:
+                return {"status": "success", "json": json.loads(match.group(1))}
+        return {"status": "error", "content": [{"text": "File operation returned no result."}, *result["content"]]}
 
     def read_files(self, action):
-         # TODO: optimize
-         code = "results={}\n"
-         for p in action.paths:
-             code += f"with open('{p}', 'r') as f: results['{p}']=f.read()\n"
-         code += "print(results)"
-         return self.execute_code(ExecuteCodeAction(code=code, language=LanguageType.PYTHON))
+        result = self._run_file_script(_READ_FILES_SCRIPT, list(action.paths))
+        if "json" not in result:
+            return result
+        data = result["json"]
+        content = []
+        if data["results"]:
+            content.append({"json": data["results"]})
+        if data["errors"]:
+            content.append({"text": "\n".join(data["errors"])})
+        return {"status": "success" if not data["errors"] else "error", "content": content}
 
     def write_files(self, action):
-        code = ""
-        for item in action.content:
-            text = item.text.replace("'", "\\'").replace("\n", "\\n") # naive escape
-            code += f"with open('{item.path}', 'w') as f: f.write('{text}')\n"
-        return self.execute_code(ExecuteCodeAction(code=code, language=LanguageType.PYTHON))
-    
+        payload = [[item.path, base64.b64encode(item.text.encode("utf-8")).decode("ascii")] for item in action.content]
+        result = self._run_file_script(_WRITE_FILES_SCRIPT, payload)
+        if "json" not in result:
+            return result
+        data = result["json"]
+        if data["errors"]:
+            return {"status": "error", "content": [{"text": "\n".join(data["errors"])}]}
+        return {"status": "success", "content": [{"text": f"Written {data['written']} files."}]}
+
     def remove_files(self, action):
-        code = "import os\n"
-        for p in action.paths:
-             code += f"os.remove('{p}')\n"
-        return self.execute_code(ExecuteCodeAction(code=code, language=LanguageType.PYTHON))
+        result = self._run_file_script(_REMOVE_FILES_SCRIPT, list(action.paths))
+        if "json" not in result:
+            return result
+        data = result["json"]
+        return {
+            "status": "success" if not data["errors"] else "error",
+            "content": [{"text": f"Deleted: {data['deleted']}\nErrors: {data['errors']}"}],
+        }
@@ -2,16 +2,27 @@ import logging
 import sys
 import io
 import contextlib
+import hashlib
+import threading
 import traceback
-from typing import Any, Dict, List, Optional
+import types
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 from strands import tool
 from .code_interpreter import CodeInterpreter
 from .models import (
     CodeInterpreterInput,
+    CopyFileAction,
     ExecuteCodeAction,
     ExecuteCommandAction,
     InitSessionAction,
@@ -25,6 +36,91 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on threads used to overlap file reads/writes in a single call
+MAX_FILE_IO_WORKERS = 32
+# Compiled code objects kept for re-submitted cells (LRU)
+CODE_CACHE_SIZE = 256
+# Per-stream cap on command output returned to the caller
+MAX_OUTPUT_BYTES = 1 << 20
+# ioctl that makes dst share src's extents (reflink) on Btrfs/XFS; _IOW(0x94, 9, int) from linux/fs.h
+FICLONE = 0x40049409
+
+
+def _read_one(path: Path, name: str) -> Tuple[Optional[str], Optional[str]]:
+    """Read one file, returning (text, None) or (None, error message)."""
+    try:
+        # One open on the success path (no stat first), one bulk read and one C-level decode
+        return path.read_bytes().decode("utf-8", errors="replace"), None
+    except (FileNotFoundError, IsADirectoryError):
+        return None, f"File not found: {name}"
+    except Exception as e:
+        return None, f"Error reading {name}: {e}"
+
+
+def _write_one(path: Path, text: str) -> None:
+    """Write one file, creating parent directories as needed."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(text.encode("utf-8"))
+
+
+def remove_path(path) -> None:
+    """Unlink a file or symlink, falling back to rmtree for a directory; raises FileNotFoundError if missing."""
+    try:
+        os.unlink(path)
+    except IsADirectoryError:
+        shutil.rmtree(path)
+    except PermissionError:
+        # macOS reports EPERM rather than EISDIR when unlinking a directory
+        if not os.path.isdir(path):
+            raise
+        shutil.rmtree(path)
+
+
+def _decode_output(data: bytes) -> str:
+    """Decode captured command output once, after trimming it to MAX_OUTPUT_BYTES."""
+    if len(data) > MAX_OUTPUT_BYTES:
+        return data[:MAX_OUTPUT_BYTES].decode("utf-8", errors="replace") + "\n[output truncated]"
+    return data.decode("utf-8", errors="replace")
+
+
+def copy_file(src: str, dst: str) -> None:
+    """
+    Copy src to dst, keeping the bytes out of userspace where the platform allows.
+
+    Tries, in order: a reflink clone (no data copied), os.copy_file_range (in-kernel copy),
+    then a plain buffered copy. Later steps continue from the file offsets left by earlier ones.
+    Raises shutil.SameFileError, like shutil.copyfile, when src and dst are the same file, since
+    opening dst for writing would truncate it first.
+    """
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+                return
+            except OSError:
+                pass
+        if hasattr(os, "copy_file_range"):
+            try:
+                # Copy until EOF rather than trusting st_size (procfs and friends report 0)
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                    pass
+                return
+            except OSError:
+                # e.g. EXDEV across filesystems on older kernels, or unsupported by the filesystem
+                pass
+        shutil.copyfileobj(fsrc, fdst)
+
+
+def _map_file_io(fn, *iterables) -> list:
+    """Run fn over the iterables on a bounded thread pool, results in input order."""
+    items = list(zip(*iterables, strict=True))
+    if len(items) <= 1:
+        return [fn(*args) for args in items]
+    with ThreadPoolExecutor(max_workers=min(MAX_FILE_IO_WORKERS, len(items))) as pool:
+        return list(pool.map(fn, *zip(*items, strict=True)))
+
 class LocalCodeInterpreter(CodeInterpreter):
     """
     A simple local implementation of CodeInterpreter that runs Python code 
@@ -37,7 +133,11 @@ class LocalCodeInterpreter(CodeInterpreter):
         self.workspace_dir = Path(workspace_dir) if workspace_dir else Path(os.getcwd()) / "workspace"
         self.workspace_dir.mkdir(parents=True, exist_ok=True)
         self._default_session = "default"
-        
+        # blake2b digest of the source -> compiled code object, least recently used first
+        self._code_cache: "OrderedDict[bytes, types.CodeType]" = OrderedDict()
+        # Cells change process-wide state (cwd, sys.stdout/stderr), so they run one at a time
+        self._exec_lock = threading.Lock()
+
         # Initialize default session
         self.sessions[self._default_session] = {
             "globals": {},
@@ -67,7 +167,16 @@ class LocalCodeInterpreter(CodeInterpreter):
         }
         return {"status": "success", "content": [{"text": f"Session '{session_name}' initialized."}]}
 
-    def list_local_sessions(self) -> Dict[str, Any]:
+    def init_sessions(self, action: InitSessionAction) -> Dict[str, Any]:
+        """Initialize several sessions in one call; existing sessions are left untouched."""
+        new = [name for name in dict.fromkeys(action.session_names or []) if name not in self.sessions]
+        self.sessions.update({name: {"globals": {}, "locals": {}, "cwd": self.workspace_dir} for name in new})
+        return {"status": "success", "content": [{"text": f"Sessions initialized: {new}"}]}
+
+    def list_local_sessions(self, include_meta: bool = False) -> Dict[str, Any]:
+        if include_meta:
+            sessions = {name: {"cwd": os.fspath(session["cwd"])} for name, session in self.sessions.items()}
+            return {"status": "success", "content": [{"json": sessions}]}
         return {
             "status": "success", 
             "content": [{"json": list(self.sessions.keys())}]
@@ -90,17 +199,23 @@ class LocalCodeInterpreter(CodeInterpreter):
         
         result_obj = None
         
-        cwd_restore = os.getcwd()
-        try:
-            os.chdir(session["cwd"])
-            with contextlib.redirect_stdout(stdout_capture), contextlib.redirect_stderr(stderr_capture):
-                # We use exec for generic python code execution
-                # Note: This is running in the same process!
-                exec(action.code, session["globals"], session["locals"])
-        except Exception:
-            traceback.print_exc(file=stderr_capture)
-        finally:
-            os.chdir(cwd_restore)
+        session_cwd = os.fspath(session["cwd"])
+        with self._exec_lock:
+            cwd_restore = os.getcwd()
+            # Skip the chdir round trip when the process is already in the session directory
+            switch_cwd = cwd_restore != session_cwd
+            try:
+                if switch_cwd:
+                    os.chdir(session_cwd)
+                with contextlib.redirect_stdout(stdout_capture), contextlib.redirect_stderr(stderr_capture):
+                    # We use exec for generic python code execution
+                    # Note: This is running in the same process!
+                    exec(self._compile_cell(action.code), session["globals"], session["locals"])
+            except Exception:
+                traceback.print_exc(file=stderr_capture)
+            finally:
+                if switch_cwd:
+                    os.chdir(cwd_restore)
             
         stdout = stdout_capture.getvalue()
         stderr = stderr_capture.getvalue()
@@ -119,6 +234,19 @@ class LocalCodeInterpreter(CodeInterpreter):
             "content": [{"text": output}]
         }
 
+    def _compile_cell(self, source: str) -> types.CodeType:
+        """Compile a code cell, reusing the code object when the same source was run recently."""
+        key = hashlib.blake2b(source.encode("utf-8"), digest_size=16).digest()
+        code = self._code_cache.get(key)
+        if code is None:
+            code = compile(source, f"<cell-{key.hex()[:8]}>", "exec")
+            self._code_cache[key] = code
+            if len(self._code_cache) > CODE_CACHE_SIZE:
+                self._code_cache.popitem(last=False)
+        else:
+            self._code_cache.move_to_end(key)
+        return code
+
     def execute_command(self, action: ExecuteCommandAction) -> Dict[str, Any]:
         # Simple subprocess implementation
         import subprocess
@@ -127,20 +255,20 @@ class LocalCodeInterpreter(CodeInterpreter):
         cwd = self.sessions.get(session_name, {}).get("cwd", self.workspace_dir)
         
         try:
+             # Explicit argv for sh: no extra shell layer, and subprocess can use posix_spawn
              result = subprocess.run(
-                action.command, 
-                shell=True, 
+                ["/bin/sh", "-c", action.command],
                 cwd=cwd,
+                env={**os.environ, **action.env} if action.env else None,
                 capture_output=True,
-                text=True,
                 timeout=60
             )
              
              output = ""
              if result.stdout:
-                 output += f"STDOUT:\n{result.stdout}\n"
+                 output += f"STDOUT:\n{_decode_output(result.stdout)}\n"
              if result.stderr:
-                 output += f"STDERR:\n{result.stderr}\n"
+                 output += f"STDERR:\n{_decode_output(result.stderr)}\n"
                  
              return {
                  "status": "success" if result.returncode == 0 else "error",
@@ -153,13 +281,14 @@ class LocalCodeInterpreter(CodeInterpreter):
         session_name = action.session_name or self._default_session
         cwd = self.sessions.get(session_name, {}).get("cwd", self.workspace_dir)
         target_path = cwd / (action.path or ".")
-        
-        if not target_path.exists():
-             return {"status": "error", "content": [{"text": f"Path not found: {target_path}"}]}
-             
+
         try:
-            files = [f.name for f in target_path.iterdir()]
+            # scandir entries carry their names from the directory read; no Path object per entry
+            with os.scandir(target_path) as entries:
+                files = [entry.name for entry in entries]
             return {"status": "success", "content": [{"json": files}]}
+        except FileNotFoundError:
+            return {"status": "error", "content": [{"text": f"Path not found: {target_path}"}]}
         except Exception as e:
             return {"status": "error", "content": [{"text": str(e)}]}
 
@@ -169,18 +298,16 @@ class LocalCodeInterpreter(CodeInterpreter):
         
         results = {}
         errors = []
-        
-        for p in action.paths:
-            try:
-                path = cwd / p
-                if path.exists() and path.is_file():
-                    with open(path, 'r') as f:
-                        results[p] = f.read()
-                else:
-                    errors.append(f"File not found: {p}")
-            except Exception as e:
-                errors.append(f"Error reading {p}: {e}")
-                
+
+        # Reads overlap on a thread pool; results are zipped back in request order
+        outcomes = _map_file_io(_read_one, [cwd / p for p in action.paths], action.paths)
+        for p, (data, error) in zip(action.paths, outcomes, strict=True):
+            if error is None:
+                results[p] = data
+            else:
+                errors.append(error)
+
+
         content = []
         if results:
             content.append({"json": results})
@@ -193,12 +320,8 @@ class LocalCodeInterpreter(CodeInterpreter):
         session_name = action.session_name or self._default_session
         cwd = self.sessions.get(session_name, {}).get("cwd", self.workspace_dir)
         
-        for item in action.content:
-            path = cwd / item.path
-            path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, 'w') as f:
-                f.write(item.text)
-                
+        _map_file_io(_write_one, [cwd / item.path for item in action.content], [item.text for item in action.content])
+
         return {"status": "success", "content": [{"text": f"Written {len(action.content)} files."}]}
         
     def remove_files(self, action: RemoveFilesAction) -> Dict[str, Any]:
@@ -211,12 +334,10 @@ class LocalCodeInterpreter(CodeInterpreter):
         for p in action.paths:
             path = cwd / p
             try:
-                if path.is_file():
-                    path.unlink()
-                    deleted.append(p)
-                elif path.is_dir():
-                    shutil.rmtree(path)
-                    deleted.append(p)
+                remove_path(path)
+                deleted.append(p)
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 errors.append(f"Error removing {p}: {e}")
                 
@@ -224,3 +345,16 @@ class LocalCodeInterpreter(CodeInterpreter):
             "status": "success", 
             "content": [{"text": f"Deleted: {deleted}\nErrors: {errors}"}]
         }
+
+    def copy_file(self, action: CopyFileAction) -> Dict[str, Any]:
+        """Copy a file within the session's working directory without reading it into Python."""
+        cwd = self.sessions.get(action.session_name or self._default_session, {}).get("cwd", self.workspace_dir)
+        target = cwd / action.destination
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            copy_file(os.fspath(cwd / action.source), os.fspath(target))
+        except FileNotFoundError:
+            return {"status": "error", "content": [{"text": f"File not found: {action.source}"}]}
+        except Exception as e:
+            return {"status": "error", "content": [{"text": f"Error copying {action.source}: {e}"}]}
+        return {"status": "success", "content": [{"text": f"Copied {action.source} to {action.destination}"}]}
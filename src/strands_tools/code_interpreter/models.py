@@ -6,7 +6,7 @@ with discriminated unions, ensuring required fields are present for each action
 """
 
 from enum import Enum
-from typing import List, Literal, Optional, Union
+from typing import Dict, List, Literal, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -38,6 +38,10 @@ class InitSessionAction(BaseModel):
     session_name: Optional[str] = Field(
         default=None, description="Session name. If not provided, a default session will be used."
     )
+    session_names: Optional[List[str]] = Field(
+        default=None,
+        description="Several session names to initialize in one call. When provided, session_name is ignored.",
+    )
 
 
 class ListLocalSessionsAction(BaseModel):
@@ -45,6 +49,9 @@ class ListLocalSessionsAction(BaseModel):
     available, check their status, or find the session name you need for other operations."""
 
     type: Literal["listLocalSessions"] = Field(description="List all local sessions managed by this tool instance")
+    include_meta: bool = Field(
+        default=False, description="Also return each session's metadata, such as its working directory"
+    )
 
 
 class ExecuteCodeAction(BaseModel):
@@ -76,6 +83,11 @@ class ExecuteCommandAction(BaseModel):
 
     command: str = Field(description="Required shell command to execute")
 
+    env: Optional[Dict[str, str]] = Field(
+        default=None,
+        description="Extra environment variables for this command only, on top of the sandbox environment",
+    )
+
 
 class ReadFilesAction(BaseModel):
     """Read the contents of one or more files from the sandbox file system. Use this to examine data files,
@@ -129,6 +141,20 @@ class WriteFilesAction(BaseModel):
     content: List[FileContent] = Field(description="Required list of file content to write")
 
 
+class CopyFileAction(BaseModel):
+    """Copy a file to a new path within the sandbox file system. Use this to duplicate data or code files without
+    reading them back and writing them out again; the copy is made on the sandbox side."""
+
+    type: Literal["copyFile"] = Field(description="Copy a file in the code interpreter")
+
+    session_name: Optional[str] = Field(
+        default=None, description="Session name. If not provided, uses the default session."
+    )
+
+    source: str = Field(description="Required path of the file to copy")
+    destination: str = Field(description="Required path to copy the file to (parent directories are created)")
+
+
 class CodeInterpreterInput(BaseModel):
     action: Union[
         InitSessionAction,
@@ -139,4 +165,5 @@ class CodeInterpreterInput(BaseModel):
         ListFilesAction,
         RemoveFilesAction,
         WriteFilesAction,
+        CopyFileAction,
     ] = Field(discriminator="type")
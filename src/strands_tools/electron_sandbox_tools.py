@@ -1,16 +1,275 @@
 
+import asyncio
+import base64
+import contextlib
+import contextvars
 import json
 import logging
 import os
-import asyncio
-from typing import Any, Dict, List, Optional, Union
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib json module is used instead
+    orjson = None
 
 from strands import tool
+
 from .browser.browser import Browser
 from .browser.models import BrowserInput, EvaluateAction, InitSessionAction
 
 logger = logging.getLogger(__name__)
 
+
+def _dumps(obj: Any) -> str:
+    """JSON-encode with orjson when installed (C, several times faster on large payloads), else json."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def _b64encode(text: str) -> str:
+    """Base64 of the UTF-8 bytes of text, as str."""
+    return base64.b64encode(text.encode("utf-8")).decode("ascii")
+
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the latter either way
+_loads = orjson.loads if orjson is not None else json.loads
+
+# Sandbox IPC scripts are JS functions called with [args, timeoutMs] that return the IPC result object.
+# Their source never changes for a given operation, so the renderer compiles each one once and reuses it.
+
+# Opening statements shared by the sandbox scripts: the sandbox API and its availability check, the
+# failure result for a missing method, and withTimeout, which rejects a call still pending after ms
+_SANDBOX_PRELUDE = """
+    const sandbox = window.electron && window.electron.sandbox;
+    const hasSandbox = (...methods) => !!sandbox && methods.every((m) => typeof sandbox[m] === "function");
+    const unavailable = (label) => ({"success": false, "error": "Electron sandbox API unavailable for " + label});
+    const withTimeout = (call, ms = timeoutMs) => {
+        let timer;
+        const timeout = new Promise((_, reject) => {
+            timer = setTimeout(() => reject(new Error("IPC timeout after " + ms + "ms")), ms);
+        });
+        return Promise.race([call, timeout]).finally(() => clearTimeout(timer));
+    };
+    const errorText = (e) => String(e && e.message ? e.message : e);
+"""
+
+# Generic call: window.electron.sandbox[method](...args), one script shared by every method
+_IPC_SCRIPT = """async ([[method, args], timeoutMs]) => {""" + _SANDBOX_PRELUDE + """
+    if (!hasSandbox(method)) {
+        return unavailable(method);
+    }
+    try {
+        return await withTimeout(sandbox[method](...args));
+    } catch (e) {
+        return {"success": false, "error": errorText(e)};
+    }
+}"""
+
+# File contents up to this many UTF-16 units come back in the readFile response; longer ones are
+# held in the page and fetched in pieces of this size, so no single CDP message carries a huge file
+READ_CHUNK_CHARS = 256 * 1024
+# Chunk fetches kept in flight at once
+READ_CHUNK_WINDOW = 4
+
+# readFile with the line range (if any) cut out inside the page, so only the requested lines cross
+# CDP; same semantics as Python's "\n".join(content.split("\n")[startLine:endLine]). Content over
+# chunkSize is parked in window.__strandsReads and only its first chunk is returned, with the chunk
+# bounds (never splitting a surrogate pair) for _READ_CHUNK_SCRIPT.
+_READ_FILE_SCRIPT = """async ([[path, startLine, endLine, chunkSize], timeoutMs]) => {""" + _SANDBOX_PRELUDE + """
+    if (!hasSandbox("readFile")) {
+        return unavailable("readFile");
+    }
+    try {
+        const res = await withTimeout(sandbox.readFile(path));
+        if (!res || !res.success) {
+            return res;
+        }
+        let content = res.content || "";
+        if (startLine < 0 || (endLine !== null && endLine < 0)) {
+            // Negative bounds count from the end, which needs the full line count
+            const lines = content.split("\\n");
+            content = lines.slice(startLine, endLine === null ? lines.length : endLine).join("\\n");
+        } else if (startLine > 0 || endLine !== null) {
+            // Find the newlines bounding the range and slice once, without a per-line array
+            let from = 0;
+            for (let n = 0; n < startLine && from <= content.length; n++) {
+                const nl = content.indexOf("\\n", from);
+                from = nl < 0 ? content.length + 1 : nl + 1;
+            }
+            let to = content.length + 1;
+            if (endLine !== null) {
+                to = from;
+                for (let n = startLine; n < endLine && to <= content.length; n++) {
+                    const nl = content.indexOf("\\n", to);
+                    to = nl < 0 ? content.length + 1 : nl + 1;
+                }
+            }
+            content = to > from ? content.slice(from, to - 1) : "";
+        }
+        if (content.length <= chunkSize) {
+            return {...res, "content": content};
+        }
+        const bounds = [];
+        for (let start = 0; start < content.length; ) {
+            let end = Math.min(start + chunkSize, content.length);
+            const last = content.charCodeAt(end - 1);
+            if (end < content.length && last >= 0xd800 && last <= 0xdbff) {
+                end -= 1;
+            }
+            bounds.push([start, end]);
+            start = end;
+        }
+        const readId = Math.random().toString(36).slice(2) + Date.now().toString(36);
+        window.__strandsReads = window.__strandsReads || {};
+        window.__strandsReads[readId] = {"content": content, "bounds": bounds, "remaining": bounds.length - 1};
+        return {...res, "content": content.slice(0, bounds[0][1]), "readId": readId, "chunks": bounds.length};
+    } catch (e) {
+        return {"success": false, "error": errorText(e)};
+    }
+}"""
+
+# One chunk of a parked read; the entry is dropped after its last chunk is fetched or on release
+_READ_CHUNK_SCRIPT = """async ([[readId, index, release], timeoutMs]) => {
+    const reads = window.__strandsReads || {};
+    const entry = reads[readId];
+    if (!entry) {
+        return {"success": false, "error": "Chunked read expired"};
+    }
+    if (release || --entry.remaining <= 0) {
+        delete reads[readId];
+    }
+    if (release) {
+        return {"success": true};
+    }
+    const [start, end] = entry.bounds[index];
+    return {"success": true, "content": entry.content.slice(start, end)};
+}"""
+
+# shell with stdout and stderr joined in the page into one "output" string; output longer than
+# chunkSize is parked in window.__strandsReads like a large read and fetched with _READ_CHUNK_SCRIPT
+_SHELL_SCRIPT = """async ([[command, args, options, chunkSize], timeoutMs]) => {""" + _SANDBOX_PRELUDE + """
+    if (!hasSandbox("shell")) {
+        return unavailable("shell");
+    }
+    try {
+        const res = await withTimeout(sandbox.shell(command, args, options));
+        if (!res) {
+            return res;
+        }
+        const {stdout, stderr, ...rest} = res;
+        const output = (stdout || "") + (stderr || "");
+        if (output.length <= chunkSize) {
+            return {...rest, "output": output};
+        }
+        const bounds = [];
+        for (let start = 0; start < output.length; ) {
+            let end = Math.min(start + chunkSize, output.length);
+            const last = output.charCodeAt(end - 1);
+            if (end < output.length && last >= 0xd800 && last <= 0xdbff) {
+                end -= 1;
+            }
+            bounds.push([start, end]);
+            start = end;
+        }
+        const readId = Math.random().toString(36).slice(2) + Date.now().toString(36);
+        window.__strandsReads = window.__strandsReads || {};
+        window.__strandsReads[readId] = {"content": output, "bounds": bounds, "remaining": bounds.length - 1};
+        return {...rest, "output": output.slice(0, bounds[0][1]), "readId": readId, "chunks": bounds.length};
+    } catch (e) {
+        return {"success": false, "error": errorText(e)};
+    }
+}"""
+
+# readFile, replace and writeFile in one evaluate
+_STR_REPLACE_SCRIPT = """async ([[path, oldStr, newStr], timeoutMs]) => {""" + _SANDBOX_PRELUDE + """
+    if (!hasSandbox("readFile", "writeFile")) {
+        return {...unavailable("strReplace"), "stage": "read"};
+    }
+    let stage = "read";
+    try {
+        const read = await withTimeout(sandbox.readFile(path));
+        if (!read || !read.success) {
+            return {...read, "success": false, "stage": stage};
+        }
+        const content = read.content || "";
+        // One scan finds the first occurrence, which is replaced by slicing; String.replace
+        // would expand "$&" etc. in newStr
+        const index = content.indexOf(oldStr);
+        if (index < 0) {
+            return {"success": false, "notFound": true};
+        }
+        stage = "write";
+        const updated = content.slice(0, index) + newStr + content.slice(index + oldStr.length);
+        const res = await withTimeout(sandbox.writeFile(path, updated));
+        return res && res.success ? res : {...res, "success": false, "stage": stage};
+    } catch (e) {
+        return {"success": false, "stage": stage, "error": errorText(e)};
+    }
+}"""
+
+# Extra seconds the Python side waits past a script's own timeoutMs before giving up on the evaluate,
+# a backstop for a renderer that hangs or never settles the page-side race
+EVALUATE_TIMEOUT_MARGIN = 5.0
+
+# Python-side encoding and parsing of payloads longer than this many chars runs in a worker thread,
+# so the event loop keeps serving other IPCs meanwhile; smaller ones stay on the loop
+OFFLOAD_MIN_CHARS = 1_000_000
+
+# Content longer than this many chars is written through _WRITE_BASE64_SCRIPT
+WRITE_BASE64_MIN_CHARS = 16 * 1024
+
+# writeFile with the content sent as base64 and decoded once in the page: compact ASCII that needs
+# no escaping when it is inlined into the evaluate source, whatever quotes or newlines the file holds
+_WRITE_BASE64_SCRIPT = """async ([[path, data], timeoutMs]) => {""" + _SANDBOX_PRELUDE + """
+    if (!hasSandbox("writeFile")) {
+        return unavailable("writeFile");
+    }
+    try {
+        const content = new TextDecoder().decode(Uint8Array.from(atob(data), (c) => c.charCodeAt(0)));
+        return await withTimeout(sandbox.writeFile(path, content));
+    } catch (e) {
+        return {"success": false, "error": errorText(e)};
+    }
+}"""
+
+# Generic calls queued inside ElectronSandboxTools.batch(), run in order in one evaluate. Each op is
+# [method, args, timeoutMs]; a failing op is reported in place and the rest still run.
+_BATCH_SCRIPT = """async ([ops, timeoutMs]) => {""" + _SANDBOX_PRELUDE + """
+    const results = [];
+    for (const [method, args, opTimeoutMs] of ops) {
+        if (!hasSandbox(method)) {
+            results.push(unavailable(method));
+            continue;
+        }
+        try {
+            results.push(await withTimeout(sandbox[method](...args), opTimeoutMs));
+        } catch (e) {
+            results.push({"success": false, "error": errorText(e)});
+        }
+    }
+    return {"success": true, "results": results};
+}"""
+
+@dataclass
+class _SandboxBatch:
+    """Calls queued by one ElectronSandboxTools.batch() block and the task flushing them."""
+
+    tools: "ElectronSandboxTools"
+    ops: List[Tuple[str, List[Any], int, asyncio.Future]] = field(default_factory=list)
+    flusher: Optional[asyncio.Future] = None
+    closed: bool = False
+
+
+# The batch() block the current task runs in. Tasks started inside the block inherit it; calls from
+# any other task, even on the same ElectronSandboxTools, run on their own and are never queued.
+_current_batch: contextvars.ContextVar[Optional[_SandboxBatch]] = contextvars.ContextVar(
+    "electron_sandbox_batch", default=None
+)
+
+
 class ElectronSandboxTools:
     """
     Wraps Electron's sandboxed IPC methods as Strands tools.
@@ -19,12 +278,198 @@ class ElectronSandboxTools:
     
     def __init__(self, browser: Browser):
         self.browser = browser
+        # Set after the first successful setup; later calls skip the start/session checks and the
+        # shell page lookup. Each is cleared when it stops working and rediscovered on the next call.
+        self._session_name: Optional[str] = None
+        self._shell_page = None
+
+    @contextlib.asynccontextmanager
+    async def batch(self) -> AsyncIterator["ElectronSandboxTools"]:
+        """
+        Coalesce sandbox calls made inside the block into shared round trips.
+
+        Generic IPCs (file_write, shell, list_files, ...) issued in the same event loop turn,
+        by this task or tasks it starts inside the block, are sent as one evaluate and run in
+        the order they were made. Awaiting a call still returns its own result; the block exits
+        once every queued call has run. file_read, editor str_replace and large writes keep
+        their own scripts and run only after every call queued before them.
+        """
+        if self._active_batch() is not None:
+            yield self
+            return
+        batch = _SandboxBatch(self)
+        token = _current_batch.set(batch)
+        try:
+            yield self
+        finally:
+            await self._drain_batch(batch)
+            batch.closed = True
+            _current_batch.reset(token)
+
+    def _active_batch(self) -> Optional[_SandboxBatch]:
+        """The batch() block of this instance that the current task runs in, if any."""
+        batch = _current_batch.get()
+        if batch is None or batch.tools is not self or batch.closed:
+            return None
+        return batch
+
+    @staticmethod
+    async def _drain_batch(batch: _SandboxBatch) -> None:
+        """Wait until every call queued in batch so far has run."""
+        while batch.ops or batch.flusher is not None:
+            if batch.flusher is None:
+                batch.flusher = asyncio.ensure_future(ElectronSandboxTools._flush_batch(batch))
+            await batch.flusher
+
+    async def _run_after_batch(
+        self, script: str, args: List[Any], label: str, timeout_ms: int, total_timeout_ms: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """_run_script for calls that bypass the batch queue, run only after the calls queued before them."""
+        batch = self._active_batch()
+        if batch is not None:
+            await self._drain_batch(batch)
+        return await self._run_script(script, args, label, timeout_ms, total_timeout_ms)
 
     async def _call_electron(self, method: str, args: List[Any], timeout_ms: int = 15000) -> Dict[str, Any]:
         """
         Calls window.electron.sandbox.<method>(...args) via browser.evaluate().
         Ensures a browser session exists before making the call.
         """
+        batch = self._active_batch()
+        if batch is not None:
+            future = asyncio.get_running_loop().create_future()
+            batch.ops.append((method, args, timeout_ms, future))
+            if batch.flusher is None:
+                # Starts on the next loop turn, after everything queued in this one
+                batch.flusher = asyncio.ensure_future(self._flush_batch(batch))
+            return await future
+        return await self._run_script(_IPC_SCRIPT, [method, args], method, timeout_ms)
+
+    @staticmethod
+    async def _flush_batch(batch: _SandboxBatch) -> None:
+        """Send queued batch() calls, one evaluate per group, until the queue is empty."""
+        try:
+            while batch.ops:
+                ops, batch.ops = batch.ops, []
+                try:
+                    resp = await batch.tools._run_script(
+                        _BATCH_SCRIPT,
+                        [[method, args, timeout_ms] for method, args, timeout_ms, _ in ops],
+                        "batch",
+                        # The ops run one after another, each bounded by its own timeout in the page
+                        sum(timeout_ms for _, _, timeout_ms, _ in ops),
+                    )
+                except Exception as e:
+                    resp = {"success": False, "error": f"Failed to call Electron IPC: {str(e)}"}
+                results = resp.get("results")
+                if not resp.get("success"):
+                    results = [resp] * len(ops)
+                elif not isinstance(results, list) or len(results) != len(ops):
+                    error = {"success": False, "error": f"Unexpected result from Electron sandbox batch: {resp!r}"}
+                    results = [error] * len(ops)
+                for (_, _, _, future), result in zip(ops, results, strict=True):
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            batch.flusher = None
+
+    async def _str_replace(self, path: str, old_str: str, new_str: str, timeout_ms: int = 15000) -> Dict[str, Any]:
+        """
+        Replaces the first occurrence of old_str with new_str in a sandbox file in one
+        browser.evaluate() round trip: readFile, the replacement and writeFile all run inside the page.
+
+        The result carries "stage" ("read" or "write") on IPC failure and "notFound" when
+        old_str does not occur in the file.
+        """
+        # readFile and writeFile are each bounded by timeout_ms in the page
+        return await self._run_after_batch(
+            _STR_REPLACE_SCRIPT, [path, old_str, new_str], "strReplace", timeout_ms, total_timeout_ms=2 * timeout_ms
+        )
+
+    async def _run_script(
+        self, script: str, args: List[Any], label: str, timeout_ms: int, total_timeout_ms: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Evaluates a sandbox IPC script, a JS function taking [args, timeoutMs], on the shell
+        page (or the browser session) and returns the result object. label names the
+        operation in error messages; total_timeout_ms is the most the whole script can take
+        when it makes several IPCs (default timeout_ms).
+
+        The function source is constant per operation and the arguments travel separately,
+        so the renderer compiles each script once.
+        """
+        page = self._shell_page
+        if page is not None and page.is_closed():
+            page = self._shell_page = None
+        if page is None and self._session_name is None:
+            error = await self._ensure_session()
+            if error:
+                return error
+
+        # Every script races each IPC against timeoutMs in the page, which settles the evaluate with
+        # an "IPC timeout after ...ms" error; the outer wait only catches a renderer that never answers
+        backstop = (total_timeout_ms or timeout_ms) / 1000 + EVALUATE_TIMEOUT_MARGIN
+        try:
+            result = await asyncio.wait_for(self._evaluate_on_shell(script, args, timeout_ms), backstop)
+        except asyncio.TimeoutError:
+            # The page may be hung; look it up again on the next call
+            self._shell_page = None
+            return {"success": False, "error": f"Electron sandbox {label} did not respond within {backstop:g}s"}
+        except Exception as e:
+            return {"success": False, "error": f"Failed to call Electron IPC: {str(e)}"}
+
+        if not isinstance(result, dict):
+            return {"success": False, "error": f"Unexpected result from Electron sandbox {label}: {result!r}"}
+        return result
+
+    async def _evaluate_on_shell(self, script: str, args: List[Any], timeout_ms: int) -> Any:
+        """Evaluate script with [args, timeout_ms] on the shell page, falling back to browser.evaluate()."""
+        page = self._shell_page
+        if page is None and hasattr(self.browser, "_get_shell_page"):
+            try:
+                page = self._shell_page = await self.browser._get_shell_page()
+            except Exception:
+                page = None
+        if page is not None:
+            try:
+                # The result object comes back already deserialized by the CDP transport
+                return await page.evaluate(script, [args, timeout_ms])
+            except Exception:
+                # Navigated away or detached: look the page up again on the next call
+                self._shell_page = None
+        if self._session_name is None:
+            error = await self._ensure_session()
+            if error:
+                return error
+        # EvaluateAction takes only source text and reports the result as text, so on this
+        # path the arguments are inlined and the result is stringified for parsing here
+        eval_result = await self.browser.evaluate(EvaluateAction(
+            type="evaluate",
+            script=f"(async () => JSON.stringify(await ({script})({_dumps([args, timeout_ms])})))()",
+            session_name=self._session_name
+        ))
+        if eval_result.get("status") == "error":
+            # The session may be gone; check it again on the next call
+            self._session_name = None
+            error_msg = eval_result.get("content", [{}])[0].get("text", "Unknown error")
+            return {"success": False, "error": error_msg}
+        result_text = eval_result.get("content", [{}])[0].get("text", "{}")
+        # Strip the "Evaluation result: " / "Evaluation result (fixed): " label
+        if result_text.startswith("Evaluation result"):
+            result_text = result_text.split(": ", 1)[-1]
+        try:
+            # One parse for the object the script stringified; only a payload that arrives
+            # JSON-encoded a second time (starting with a quote) is decoded twice
+            if result_text.lstrip()[:1] == '"':
+                result_text = _loads(result_text)
+            if len(result_text) > OFFLOAD_MIN_CHARS:
+                return await asyncio.to_thread(_loads, result_text)
+            return _loads(result_text)
+        except json.JSONDecodeError as e:
+            return {"success": False, "error": f"Failed to parse result: {e}", "raw": result_text}
+
+    async def _ensure_session(self) -> Optional[Dict[str, Any]]:
+        """Start the browser and make sure a session exists for Electron IPC; returns an error result on failure."""
         # Ensure browser platform is started
         if not self.browser._started:
             await self.browser._start()
@@ -46,62 +491,8 @@ class ElectronSandboxTools:
             except Exception as e:
                 return {"success": False, "error": f"Failed to initialize browser session: {str(e)}"}
 
-        # Build JavaScript to call window.electron.sandbox methods
-        json_args = json.dumps(args)
-        script_json = f"""
-            (async () => {{
-                const args = {json_args};
-                const timeoutMs = {timeout_ms};
-                if (!window.electron || !window.electron.sandbox || typeof window.electron.sandbox.{method} !== "function") {{
-                    return JSON.stringify({{"success": false, "error": "Electron sandbox API unavailable for {method}"}});
-                }}
-                const call = window.electron.sandbox.{method}(...args);
-                const timeout = new Promise((_, reject) => setTimeout(() => reject(new Error("IPC timeout")), timeoutMs));
-                try {{
-                    const res = await Promise.race([call, timeout]);
-                    return JSON.stringify(res);
-                }} catch (e) {{
-                    return JSON.stringify({{"success": false, "error": String(e && e.message ? e.message : e)}});
-                }}
-            }})()
-        """
-
-        async def _evaluate_on_shell():
-            if hasattr(self.browser, "_get_shell_page"):
-                try:
-                    page = await self.browser._get_shell_page()
-                    if page:
-                        return await page.evaluate(script_json)
-                except Exception:
-                    pass
-            return await self.browser.evaluate(EvaluateAction(
-                type="evaluate",
-                script=script_json,
-                session_name=session_name
-            ))
-
-        # Call browser.evaluate with timeout guard
-        try:
-            eval_result = await asyncio.wait_for(_evaluate_on_shell(), timeout=max(2, (timeout_ms / 1000) + 2))
-        except asyncio.TimeoutError:
-            return {"success": False, "error": f"Electron sandbox {method} timed out after {timeout_ms}ms"}
-        except Exception as e:
-            return {"success": False, "error": f"Failed to call Electron IPC: {str(e)}"}
-
-        # If result came from Browser.evaluate (dict), unpack it
-        if isinstance(eval_result, dict):
-            if eval_result.get("status") == "error":
-                error_msg = eval_result.get("content", [{}])[0].get("text", "Unknown error")
-                return {"success": False, "error": error_msg}
-            result_text = eval_result.get("content", [{}])[0].get("text", "{}")
-        else:
-            result_text = eval_result if isinstance(eval_result, str) else json.dumps(eval_result)
-
-        # Parse JSON result
-        try:
-            return json.loads(result_text)
-        except json.JSONDecodeError as e:
-            return {"success": False, "error": f"Failed to parse result: {e}", "raw": result_text}
+        self._session_name = session_name
+        return None
 
     @tool
     async def shell(
@@ -118,39 +509,88 @@ class ElectronSandboxTools:
         """
         # Normalize command
         cmds = command if isinstance(command, list) else [command]
-        
-        results = []
-        for cmd_item in cmds:
-            cmd_str = cmd_item if isinstance(cmd_item, str) else cmd_item.get("command")
-            if not cmd_str: continue
-            
-            # Call Electron
-            # signature: shell(command, args, options)
-            # We treat the whole string as command + args for simplicity in this wrapper?
-            # Or we let Electron spawn handle it with shell=True.
-            
+        cmd_strs = [cmd_item if isinstance(cmd_item, str) else cmd_item.get("command") for cmd_item in cmds]
+        cmd_strs = [cmd_str for cmd_str in cmd_strs if cmd_str]
+
+        if parallel:
+            # Independent IPCs in flight together: wall time is the slowest command, not the sum.
+            # Every command runs, so ignore_errors has nothing to stop here. Parallel commands have
+            # no order between them, so a non-interactive command repeated in the list runs once and
+            # its duplicates reuse the result.
+            run_strs = list(dict.fromkeys(cmd_strs)) if non_interactive else cmd_strs
+            outcomes = await asyncio.gather(
+                *(self._run_shell_command(cmd_str, timeout) for cmd_str in run_strs), return_exceptions=True
+            )
+            results = [
+                outcome if not isinstance(outcome, BaseException) else {
+                    "command": cmd_str,
+                    "status": "error",
+                    "output": "",
+                    "exit_code": -1,
+                    "error": str(outcome),
+                }
+                for cmd_str, outcome in zip(run_strs, outcomes, strict=True)
+            ]
+            if non_interactive:
+                seen = dict(zip(run_strs, results, strict=True))
+                results = [dict(seen[cmd_str]) for cmd_str in cmd_strs]
+        else:
+            # Sequential commands can depend on each other (ls, touch f, ls), so every one runs
+            results = []
+            for cmd_str in cmd_strs:
+                result = await self._run_shell_command(cmd_str, timeout)
+                results.append(result)
+
+                if not ignore_errors and result["status"] != "success":
+                    break
+
+        # Format output for Bedrock - must be valid JSON object or text; compact, since
+        # pretty-printing only adds bytes for the model to read
+        success = all(r["status"] == "success" for r in results)
+        return {
+            "status": "success" if success else "error",
+            "content": [{"text": _dumps(results)}]
+        }
+
+    async def _run_shell_command(self, cmd_str: str, timeout: int) -> Dict[str, Any]:
+        """Run one command through the sandbox shell IPC and shape its per-command result."""
+        # Call Electron
+        # signature: shell(command, args, options)
+        # We treat the whole string as command + args for simplicity in this wrapper?
+        # Or we let Electron spawn handle it with shell=True.
+        if self._active_batch() is not None:
+            # Queued with the rest of the batch as a plain shell IPC
             resp = await self._call_electron(
                 "shell",
                 [cmd_str, [], {"timeout": timeout}],
                 timeout_ms=timeout + 2000
             )
+            stdout = resp.get("stdout") or ""
+            stderr = resp.get("stderr") or ""
+            # Usually one stream is empty: reuse the other string instead of copying it into a new one
+            output = stdout + stderr if stdout and stderr else stdout or stderr
+        else:
+            # The streams are joined in the page; large output comes back in chunks like a large read
+            resp = await self._run_script(
+                _SHELL_SCRIPT,
+                [cmd_str, [], {"timeout": timeout}, READ_CHUNK_CHARS],
+                "shell",
+                timeout + 2000
+            )
+            if resp.get("readId"):
+                chunked = await self._read_remaining_chunks({**resp, "content": resp["output"]})
+                if not chunked.get("success"):
+                    resp = {**resp, **chunked}
+                output = chunked.get("content", "")
+            else:
+                output = resp.get("output") or ""
 
-            results.append({
-                "command": cmd_str,
-                "status": "success" if resp.get("success") else "error",
-                "output": resp.get("stdout", "") + resp.get("stderr", ""),
-                "exit_code": resp.get("exitCode", -1),
-                "error": resp.get("error")
-            })
-
-            if not ignore_errors and not resp.get("success"):
-                break
-
-        # Format output for Bedrock - must be valid JSON object or text
-        success = all(r["status"] == "success" for r in results)
         return {
-            "status": "success" if success else "error",
-            "content": [{"text": json.dumps(results, indent=2)}]
+            "command": cmd_str,
+            "status": "success" if resp.get("success") else "error",
+            "output": output,
+            "exit_code": resp.get("exitCode", -1),
+            "error": resp.get("error")
         }
 
     @tool
@@ -164,7 +604,12 @@ class ElectronSandboxTools:
         """
         Read files from the secure agent sandbox.
         """
-        resp = await self._call_electron("readFile", [path], timeout_ms=5000)
+        # Any line range is cut out in the page, only those lines come back
+        resp = await self._run_after_batch(
+            _READ_FILE_SCRIPT, [path, start_line, end_line, READ_CHUNK_CHARS], "readFile", 5000
+        )
+        if resp.get("success") and resp.get("readId"):
+            resp = await self._read_remaining_chunks(resp)
         
         if not resp.get("success"):
             return {
@@ -173,18 +618,30 @@ class ElectronSandboxTools:
             }
         
         content = resp.get("content", "")
-        
-        # Handle lines mode
-        if start_line > 0 or end_line is not None:
-            lines = content.split('\n')
-            end = end_line if end_line is not None else len(lines)
-            content = '\n'.join(lines[start_line:end])
              
         return {
             "status": "success",
             "content": [{"text": content}]
         }
 
+    async def _read_remaining_chunks(self, resp: Dict[str, Any]) -> Dict[str, Any]:
+        """Fetch the rest of a read parked in the page, READ_CHUNK_WINDOW chunks at a time."""
+        read_id = resp["readId"]
+        parts = [resp.get("content", "")]
+        indices = range(1, resp["chunks"])
+        for i in range(0, len(indices), READ_CHUNK_WINDOW):
+            chunks = await asyncio.gather(
+                *(self._run_script(_READ_CHUNK_SCRIPT, [read_id, index, False], "readFile", 5000)
+                  for index in indices[i : i + READ_CHUNK_WINDOW])
+            )
+            for chunk in chunks:
+                if not chunk.get("success"):
+                    # Drop the parked content rather than leaving it in the page
+                    await self._run_script(_READ_CHUNK_SCRIPT, [read_id, 0, True], "readFile", 5000)
+                    return chunk
+                parts.append(chunk.get("content", ""))
+        return {"success": True, "content": "".join(parts)}
+
     @tool
     async def file_write(
         self,
@@ -196,8 +653,18 @@ class ElectronSandboxTools:
         Write files to the secure agent sandbox.
         """
         # TODO: Implement append in Electron if needed. For now assume overwrite.
-        
-        resp = await self._call_electron("writeFile", [path, content], timeout_ms=8000)
+        if content is None:
+            # e.g. editor create without file_text
+            return {"status": "error", "content": [{"text": f"Error writing {path}: content is required"}]}
+
+        if len(content) > WRITE_BASE64_MIN_CHARS:
+            if len(content) > OFFLOAD_MIN_CHARS:
+                data = await asyncio.to_thread(_b64encode, content)
+            else:
+                data = _b64encode(content)
+            resp = await self._run_after_batch(_WRITE_BASE64_SCRIPT, [path, data], "writeFile", 8000)
+        else:
+            resp = await self._call_electron("writeFile", [path, content], timeout_ms=8000)
         
         if not resp.get("success"):
             return {
@@ -228,7 +695,8 @@ class ElectronSandboxTools:
             
         return {
             "status": "success",
-            "content": [{"text": json.dumps(resp.get("files", []), indent=2)}]
+            # Structured result (wrapped, as Bedrock wants a JSON object) instead of a formatted text blob
+            "content": [{"json": {"files": resp.get("files", [])}}]
         }
 
     @tool
@@ -259,15 +727,17 @@ class ElectronSandboxTools:
             return await self.file_write(path, file_text)
             
         elif command == "str_replace":
-            # Read, replace, write
-            read_res = await self.file_read(path)
-            if read_res["status"] == "error": return read_res
-            
-            content = read_res["content"][0]["text"]
-            if old_str not in content:
+            if not old_str:
+                return {"status": "error", "content": [{"text": "old_str is required for str_replace"}]}
+
+            # Read, replace, write in a single round trip
+            resp = await self._str_replace(path, old_str, new_str or "", timeout_ms=8000)
+            if resp.get("notFound"):
                 return {"status": "error", "content": [{"text": f"String '{old_str}' not found in {path}"}]}
-                
-            new_content = content.replace(old_str, new_str)
-            return await self.file_write(path, new_content)
+            if not resp.get("success"):
+                verb = "writing" if resp.get("stage") == "write" else "reading"
+                return {"status": "error", "content": [{"text": f"Error {verb} {path}: {resp.get('error')}"}]}
+
+            return {"status": "success", "content": [{"text": f"Successfully wrote to {path}"}]}
             
         return {"status": "error", "content": [{"text": f"Command {command} not supported in sandbox"}]}
@@ -0,0 +1,9 @@
+"""
+Exceptions shared by the strands_tools modules.
+"""
+
+
+class NotConfiguredError(Exception):
+    """Raised when a tool is missing a dependency or setting it needs to run."""
+
+    pass
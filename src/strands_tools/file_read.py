@@ -96,16 +96,22 @@ agent.tool.file_read(
 See the file_read function docstring for more details on modes and parameters.
 """
 
+import filecmp
+import functools
 import glob
 import json
 import os
+import re
 import time as time_module
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from os.path import expanduser
-from typing import Any, Dict, List, Optional, Union, cast
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union, cast
 
 from rich import box
-from rich.console import Console
+from rich.console import Console, Group
 from rich.markup import escape
 from rich.panel import Panel
 from rich.syntax import Syntax
@@ -139,6 +145,16 @@ FORMAT_EXTENSIONS = {
 # Reverse mapping for format detection
 EXTENSION_TO_FORMAT = {ext: fmt for fmt, exts in FORMAT_EXTENSIONS.items() for ext in exts}
 
+# Bytes read per block when counting lines for stats
+STATS_BLOCK_SIZE = 1 << 20
+# Previews longer than this many characters are not kept in the file scan cache
+PREVIEW_CACHE_MAX_CHARS = 16 * 1024
+
+# Files with more lines than this are diffed with git's histogram algorithm instead of difflib
+LARGE_DIFF_LINES = 10_000
+# A git hunk header without the function-context trailer git appends after it
+_GIT_HUNK_HEADER = re.compile(r"@@ -\S+ \+\S+ @@")
+
 
 def detect_format(file_path: str) -> str:
     """
@@ -363,6 +379,27 @@ TOOL_SPEC = {
 }
 
 
+def _iter_files(root: str, recursive: bool) -> Iterator[str]:
+    """
+    Yield the non-hidden files under root, descending into subdirectories only when recursive.
+
+    Walks with os.scandir and classifies each entry from its DirEntry, so no extra stat per file;
+    like os.walk, symlinked directories are not followed and unreadable directories are skipped.
+    """
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if recursive and not entry.is_symlink():
+                            stack.append(entry.path)
+                    elif not entry.name.startswith("."):  # Skip hidden files
+                        yield entry.path
+        except OSError:
+            continue
+
+
 def find_files(console: Console, pattern: str, recursive: bool = True) -> List[str]:
     """
     Find files matching the pattern with better error handling.
@@ -386,17 +423,7 @@ def find_files(console: Console, pattern: str, recursive: bool = True) -> List[s
             if os.path.isfile(pattern):
                 return [pattern]
             elif os.path.isdir(pattern):
-                matching_files = []
-
-                for root, _dirs, files in os.walk(pattern):
-                    if not recursive and root != pattern:
-                        continue
-
-                    for file in sorted(files):
-                        if not file.startswith("."):  # Skip hidden files
-                            matching_files.append(os.path.join(root, file))
-
-                return sorted(matching_files)
+                return sorted(_iter_files(pattern, recursive))
 
         # Handle glob patterns
         if recursive and "**" not in pattern:
@@ -455,6 +482,54 @@ def create_rich_panel(content: str, title: Optional[str] = None, file_path: Opti
     )
 
 
+def _read_preview(real_path: str) -> Tuple[str, ...]:
+    """First 50 lines of a file; only these are decoded."""
+    with open(real_path, "r") as f:
+        return tuple(islice(f, 50))
+
+
+@functools.lru_cache(maxsize=512)
+def _scan_file_cached(real_path: str, size: int, mtime_ns: int) -> Tuple[int, Optional[Tuple[str, ...]]]:
+    """
+    Line count and first 50 lines of a file; size and mtime_ns are part of the key only.
+
+    The preview is None when it is longer than PREVIEW_CACHE_MAX_CHARS, so a file of a few huge lines
+    cannot pin megabytes in the cache; callers read such previews again.
+    """
+    line_count = 0
+    # Count lines on raw bytes in large blocks (C-level counting instead of a Python loop over lines),
+    # with the same universal-newline rules as text mode: "\n", "\r\n" and a lone "\r" each end a line
+    with open(real_path, "rb") as f:
+        last = b""
+        while block := f.read(STATS_BLOCK_SIZE):
+            line_count += block.count(b"\n") + block.count(b"\r") - block.count(b"\r\n")
+            if last == b"\r" and block[:1] == b"\n":
+                line_count -= 1  # "\r\n" split across blocks
+            last = block[-1:]
+        if last and last not in b"\r\n":
+            line_count += 1  # Unterminated last line
+
+    preview_lines = _read_preview(real_path)
+    if sum(map(len, preview_lines)) > PREVIEW_CACHE_MAX_CHARS:
+        return line_count, None
+    return line_count, preview_lines
+
+
+def _scan_file(file_path: str) -> Tuple[int, int, Tuple[str, ...]]:
+    """
+    Size, line count and first 50 lines of a file.
+
+    Agents tend to ask about the same files repeatedly, so scans are memoized by
+    (real path, size, mtime): any write changes the key and the file is scanned again.
+    """
+    real_path = os.path.realpath(file_path)
+    st = os.stat(real_path)
+    line_count, preview_lines = _scan_file_cached(real_path, st.st_size, st.st_mtime_ns)
+    if preview_lines is None:
+        preview_lines = _read_preview(real_path)
+    return st.st_size, line_count, preview_lines
+
+
 def get_file_stats(console, file_path: str) -> Dict[str, Any]:
     """
     Get file statistics including size, line count, and preview.
@@ -470,20 +545,13 @@ def get_file_stats(console, file_path: str) -> Dict[str, Any]:
                         size_human (formatted size), and preview
     """
     file_path = expanduser(file_path)
+    size_bytes, line_count, preview_lines = _scan_file(file_path)
     stats: Dict[str, Any] = {
-        "size_bytes": os.path.getsize(file_path),
-        "line_count": 0,
-        "preview": "",
+        "size_bytes": size_bytes,
+        "line_count": line_count,
+        "preview": "\n".join(preview_lines),
     }
 
-    with open(file_path, "r") as f:
-        preview_lines = []
-        for i, line in enumerate(f):
-            stats["line_count"] += 1
-            if i < 50:  # First 50 lines as preview
-                preview_lines.append(line)
-
-    stats["preview"] = "\n".join(preview_lines)
     stats["size_human"] = f"{stats['size_bytes'] / 1024:.2f} KB"
 
     table = Table(title="File Statistics", box=box.DOUBLE)
@@ -526,21 +594,23 @@ def read_file_lines(console: Console, file_path: str, start_line: int = 0, end_l
         raise ValueError(f"Path is not a file: {file_path}")
 
     try:
-        with open(file_path, "r") as f:
-            all_lines = f.readlines()
-
         # Validate line numbers
         start_line = max(start_line, 0)
 
+        # Skip to start_line and read only the requested range; nothing past end_line is read
+        with open(file_path, "r") as f:
+            skipped = sum(1 for _ in islice(f, start_line))
+            lines = list(islice(f, None if end_line is None else max(end_line - start_line, 0)))
+        read_to = skipped + len(lines)
+
         if end_line is not None:
-            end_line = min(end_line, len(all_lines))
+            # Clamp to the line count, which is read_to whenever the file ends before end_line
+            end_line = min(end_line, read_to)
             if end_line < start_line:
                 raise ValueError(f"end_line ({end_line}) cannot be less than start_line ({start_line})")
 
-        lines = all_lines[start_line:end_line]
-
         # Create a preview panel
-        line_range = f"{start_line + 1}-{end_line if end_line else len(all_lines)}"
+        line_range = f"{start_line + 1}-{end_line if end_line else read_to}"
         panel = Panel(
             escape("".join(lines)),
             title=f"[bold green]Lines {line_range} from {os.path.basename(file_path)}",
@@ -666,44 +736,65 @@ def search_file(console: Console, file_path: str, pattern: str, context_lines: i
 
     results = []
     try:
-        with open(file_path, "r") as f:
-            lines = f.readlines()
-
-        total_matches = 0
-        for i, line in enumerate(lines):
-            if pattern.lower() in line.lower():
-                total_matches += 1
-                start = max(0, i - context_lines)
-                end = min(len(lines), i + context_lines + 1)
-
-                context_text = []
-                for ctx_idx in range(start, end):
-                    prefix = "  "
-                    if ctx_idx == i:
-                        prefix = "→ "  # Highlight the matching line
-                    line_text = lines[ctx_idx].rstrip()
-                    # Highlight the matching pattern in the line
-                    if ctx_idx == i:
-                        pattern_idx = line_text.lower().find(pattern.lower())
-                        if pattern_idx != -1:
-                            line_text = (
-                                line_text[:pattern_idx]
-                                + f"[bold yellow]{line_text[pattern_idx : pattern_idx + len(pattern)]}[/bold yellow]"
-                                + line_text[pattern_idx + len(pattern) :]
-                            )
-                    context_text.append(f"{prefix}{ctx_idx + 1}: {line_text}")
-
-                match_text = "\n".join(context_text)
-                # Create a panel for each match
-                panel = Panel(
+        # Lowercase the pattern once; each line is lowercased once and its match offset reused for highlighting
+        pattern_lower = pattern.lower()
+        pattern_len = len(pattern)
+
+        # Stream the file: only the last context_lines lines are kept, plus the context of matches
+        # still waiting for their trailing lines, so memory does not grow with the file
+        before: deque = deque(maxlen=context_lines)
+        pending: List[List[Any]] = []  # [line_number, context_text, trailing lines still needed]
+        panels = []
+
+        def finish(match: List[Any]) -> None:
+            match_text = "\n".join(match[1])
+            # Create a panel for each match
+            panels.append(
+                Panel(
                     escape(match_text),
-                    title=f"[bold green]Match at line {i + 1}",
+                    title=f"[bold green]Match at line {match[0]}",
                     border_style="blue",
                     expand=False,
                 )
-                console.print(panel)
+            )
+            results.append({"line_number": match[0], "context": match_text})
+
+        total_matches = 0
+        with open(file_path, "r") as f:
+            for i, line in enumerate(f):
+                line_text = line.rstrip()
+                context_line = f"  {i + 1}: {line_text}"
+
+                for match in pending:
+                    match[1].append(context_line)
+                    match[2] -= 1
+                while pending and pending[0][2] == 0:
+                    finish(pending.pop(0))
+
+                pattern_idx = line.lower().find(pattern_lower)
+                if pattern_idx != -1:
+                    total_matches += 1
+                    # Highlight the matching pattern in the line (unless it lies in stripped trailing whitespace)
+                    if pattern_idx + pattern_len <= len(line_text):
+                        line_text = (
+                            line_text[:pattern_idx]
+                            + f"[bold yellow]{line_text[pattern_idx : pattern_idx + pattern_len]}[/bold yellow]"
+                            + line_text[pattern_idx + pattern_len :]
+                        )
+                    # Highlight the matching line
+                    match = [i + 1, [*before, f"→ {i + 1}: {line_text}"], context_lines]
+                    if context_lines:
+                        pending.append(match)
+                    else:
+                        finish(match)
 
-                results.append({"line_number": i + 1, "context": match_text})
+                before.append(context_line)
+
+        # Matches near the end of the file get whatever trailing lines there were
+        for match in pending:
+            finish(match)
+        if panels:
+            console.print(Group(*panels))
 
         # Print summary
         summary = Panel(
@@ -726,6 +817,65 @@ def search_file(console: Console, file_path: str, pattern: str, context_lines: i
         raise
 
 
+def _git_histogram_diff(file_path: str, comparison_path: str) -> Optional[str]:
+    """
+    Unified diff of two files from `git diff --no-index --histogram`, laid out like create_diff's difflib output.
+
+    git's hunk-header function context and "\\ No newline at end of file" markers are dropped, and every
+    content line that ends with a newline is followed by a blank line, as difflib's lines are when joined.
+    The hunks themselves may still be split or aligned differently, since the matching algorithms differ.
+
+    Returns None when git is unavailable, fails, or reports the files as binary, so the caller can
+    fall back to difflib.
+    """
+    import subprocess
+
+    try:
+        result = subprocess.run(
+            [
+                "git",
+                "diff",
+                "--no-index",
+                "--histogram",
+                "--no-color",
+                "--no-ext-diff",
+                "--",
+                file_path,
+                comparison_path,
+            ],
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+    except OSError:
+        return None
+
+    # Exit code 0: no differences, 1: files differ, anything else: error
+    if result.returncode == 0:
+        return ""
+    if result.returncode != 1:
+        return None
+
+    # Drop git's "diff --git"/"index" preamble and name the files like difflib does
+    lines = result.stdout.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    start = next((i for i, line in enumerate(lines) if line.startswith("--- ")), None)
+    if start is None:
+        return None
+    body = lines[start + 2 :]
+    output = [f"--- {os.path.basename(file_path)}", f"+++ {os.path.basename(comparison_path)}"]
+    for i, line in enumerate(body):
+        if line.startswith("@@"):
+            output.append(_GIT_HUNK_HEADER.match(line).group(0))
+        elif not line.startswith("\\"):
+            # Lines that carried a newline in the file keep it, like difflib's readlines() input
+            at_eof_without_newline = i + 1 < len(body) and body[i + 1].startswith("\\")
+            output.append(line if at_eof_without_newline else line + "\n")
+    return "\n".join(output)
+
+
 def create_diff(file_path: str, comparison_path: str, diff_type: str = "unified") -> str:
     """
     Create a diff between two files or directories.
@@ -758,8 +908,6 @@ def create_diff(file_path: str, comparison_path: str, diff_type: str = "unified"
 
         # Handle directory comparison
         if os.path.isdir(file_path) and os.path.isdir(comparison_path):
-            diff_results = []
-
             # Get all files in both directories
             def get_files(path: str) -> set:
                 return set(str(p.relative_to(path)) for p in Path(path).rglob("*") if p.is_file())
@@ -767,21 +915,33 @@ def create_diff(file_path: str, comparison_path: str, diff_type: str = "unified"
             files1 = get_files(file_path)
             files2 = get_files(comparison_path)
 
-            # Compare files
-            all_files = sorted(files1 | files2)
-            for file in all_files:
-                path1 = os.path.join(file_path, file)
-                path2 = os.path.join(comparison_path, file)
-
+            # Result block for one relative path, or None when both sides have identical content
+            def diff_entry(file: str) -> Optional[str]:
                 if file in files1 and file in files2:
                     # Both files exist - compare content
+                    path1 = os.path.join(file_path, file)
+                    path2 = os.path.join(comparison_path, file)
+                    # Byte-identical files (sizes checked first, then chunked compare) need no line diff
+                    if filecmp.cmp(path1, path2, shallow=False):
+                        return None
                     diff = create_diff(path1, path2, diff_type)
                     if diff.strip():  # Only include if there are differences
-                        diff_results.append(f"\n=== {file} ===\n{diff}")
+                        return f"\n=== {file} ===\n{diff}"
+                    return None
                 elif file in files1:
-                    diff_results.append(f"\n=== {file} ===\nOnly in {file_path}")
+                    return f"\n=== {file} ===\nOnly in {file_path}"
                 else:
-                    diff_results.append(f"\n=== {file} ===\nOnly in {comparison_path}")
+                    return f"\n=== {file} ===\nOnly in {comparison_path}"
+
+            # Compare files; per-file diffs are independent, so they run on a thread pool
+            # (map keeps the sorted order)
+            all_files = sorted(files1 | files2)
+            if len(all_files) > 1:
+                with ThreadPoolExecutor() as executor:
+                    entries = list(executor.map(diff_entry, all_files))
+            else:
+                entries = [diff_entry(file) for file in all_files]
+            diff_results = [entry for entry in entries if entry is not None]
 
             return "\n".join(diff_results)
 
@@ -790,6 +950,12 @@ def create_diff(file_path: str, comparison_path: str, diff_type: str = "unified"
             lines1 = read_file(file_path)
             lines2 = read_file(comparison_path)
 
+            # difflib's matcher can go quadratic on large inputs; git's histogram diff stays fast there
+            if max(len(lines1), len(lines2)) > LARGE_DIFF_LINES:
+                diff = _git_histogram_diff(file_path, comparison_path)
+                if diff is not None:
+                    return diff
+
             # Create unified diff
             diff_iter = difflib.unified_diff(
                 lines1,
@@ -844,62 +1010,44 @@ def time_machine_view(file_path: str, use_git: bool = True, num_revisions: int =
             # Get relative path from repo root
             rel_path = os.path.relpath(file_path, repo_root)
 
-            # Get git log
+            # Get git log with each commit's patch in one process; every entry starts with a NUL and
+            # its header fields are separated by \x1f, so commit subjects may contain any printable text.
+            # --cc shows merges the way `git show` does.
             log_output = subprocess.check_output(
                 [
                     "git",
                     "log",
                     "-n",
                     str(num_revisions),
-                    "--pretty=format:%h|%an|%ar|%s",
+                    "--pretty=format:%x00%h%x1f%an%x1f%ar%x1f%s",
+                    "-p",
+                    "--cc",
                     "--",
                     rel_path,
                 ],
                 cwd=repo_root,
                 text=True,
-            ).split("\n")
-
-            # Get blame information
-            subprocess.check_output(["git", "blame", "--line-porcelain", rel_path], cwd=repo_root, text=True)
+            )
 
             # Process git information
             history = []
-            current_commit = None
-
-            for line in log_output:
-                if line:
-                    commit_hash, author, time, message = line.split("|")
-
-                    if not current_commit:
-                        current_commit = commit_hash
-
-                    # Get changes in this commit
-                    try:
-                        changes = subprocess.check_output(
-                            [
-                                "git",
-                                "show",
-                                "--format=",
-                                "--patch",
-                                commit_hash,
-                                "--",
-                                rel_path,
-                            ],
-                            cwd=repo_root,
-                            text=True,
-                        )
-                    except subprocess.CalledProcessError:
-                        changes = "Unable to retrieve changes"
-
-                    history.append(
-                        {
-                            "commit": commit_hash,
-                            "author": author,
-                            "time": time,
-                            "message": message,
-                            "changes": changes,
-                        }
-                    )
+            entries = log_output.split("\0")[1:]
+
+            for index, entry in enumerate(entries):
+                header, _, changes = entry.partition("\n")
+                commit_hash, author, time, message = header.split("\x1f")
+                if index < len(entries) - 1 and changes.endswith("\n"):
+                    changes = changes[:-1]  # Newline git puts between log entries
+
+                history.append(
+                    {
+                        "commit": commit_hash,
+                        "author": author,
+                        "time": time,
+                        "message": message,
+                        "changes": changes,
+                    }
+                )
 
             # Format output
             output = []
@@ -1145,8 +1293,8 @@ def file_read(tool: ToolUse, **kwargs: Any) -> ToolResult:
 
                 elif mode == "preview":
                     stats = get_file_stats(console, file_path)
-                    with open(file_path, "r") as f:
-                        content = "".join(f.readlines()[:50])
+                    # The first 50 lines come from the same (memoized) scan as the stats
+                    content = "".join(_scan_file(file_path)[2])
 
                     preview_panel = create_rich_panel(
                         content,
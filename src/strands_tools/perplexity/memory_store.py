@@ -1,25 +1,101 @@
 """
 LanceDB Vector Store for Persistent Memory
 Pattern from: persistent-memory.md lines 22-27
+
+All sessions share one table under the backend's db_path, and each row carries its session_id in the
+metadata. Stores from the earlier layout, one database per session at <db_path>/<session_id>, are
+imported into the shared table the first time their session is opened again (see
+MemoryBackend.import_legacy_session): renamed to <session_id>.migrating while the rows are copied, then to
+<session_id>.migrated.
 """
 
 import os
 from llama_index.core import VectorStoreIndex, StorageContext
+from llama_index.core.vector_stores import ExactMatchFilter, MetadataFilters
 from llama_index.vector_stores.lancedb import LanceDBVectorStore
 
 
-class MemoryStore:
-    """LanceDB-backed conversation memory with vector search"""
+class MemoryBackend:
+    """Process-wide LanceDB connection, table and embedding index shared by all sessions"""
 
     def __init__(self, db_path: str = "./lancedb", table_name: str = "chat_history"):
         """Initialize LanceDB vector store with LlamaIndex"""
+        self.db_path = db_path
+        self.table_name = table_name
         self.vector_store = LanceDBVectorStore(uri=db_path, table_name=table_name)
         self.storage_context = StorageContext.from_defaults(vector_store=self.vector_store)
         self.index = VectorStoreIndex([], storage_context=self.storage_context)
 
+    def import_legacy_session(self, session_id: str) -> int:
+        """
+        Copy a session's rows from its old per-session database into the shared table.
+
+        The old database is claimed by renaming it before any row is read, so when several callers open
+        the same session at once exactly one of them imports it; the others see it as already migrated.
+        Returns the number of rows imported (0 when there is nothing to migrate).
+        """
+        from llama_index.core.schema import Document
+
+        # The session ID names a directory: only a single plain path component can match one
+        if session_id in ("", ".", "..") or os.path.basename(session_id) != session_id:
+            return 0
+        legacy_path = os.path.join(self.db_path, session_id)
+        if not os.path.isdir(legacy_path):
+            return 0
+        claimed_path = legacy_path + ".migrating"
+        try:
+            os.rename(legacy_path, claimed_path)
+        except FileNotFoundError:
+            # Another caller claimed it first
+            return 0
+
+        import lancedb
+
+        try:
+            table = lancedb.connect(claimed_path).open_table(self.table_name)
+            rows = table.to_arrow().select(["text", "metadata"]).to_pylist()
+        except Exception:
+            # Not a readable store: put it back untouched
+            os.rename(claimed_path, legacy_path)
+            return 0
+        for row in rows:
+            metadata = row.get("metadata") or {}
+            self.index.insert(
+                Document(
+                    text=row["text"],
+                    metadata={
+                        "session_id": session_id,
+                        "query": metadata.get("query", ""),
+                        "response": metadata.get("response", ""),
+                    },
+                )
+            )
+        os.rename(claimed_path, legacy_path + ".migrated")
+        return len(rows)
+
+    def close(self):
+        """Release the LanceDB handles held by this backend"""
+        connection = getattr(self.vector_store, "_connection", None)
+        close = getattr(connection, "close", None)
+        if callable(close):
+            close()
+        self.index = None
+        self.storage_context = None
+        self.vector_store = None
+
+
+class MemoryStore:
+    """Conversation memory for one session, stored as rows of the shared chat history table"""
+
+    def __init__(self, session_id: str, backend: MemoryBackend):
+        """Bind a session to the shared backend"""
+        self.session_id = session_id
+        self.backend = backend
+        self._filters = MetadataFilters(filters=[ExactMatchFilter(key="session_id", value=session_id)])
+
     def retrieve_context(self, query: str, top_k: int = 3) -> list:
         """Retrieve top k relevant historical interactions"""
-        retriever = self.index.as_retriever(similarity_top_k=top_k)
+        retriever = self.backend.index.as_retriever(similarity_top_k=top_k, filters=self._filters)
         context_nodes = retriever.retrieve(query)
         return context_nodes
 
@@ -29,6 +105,32 @@ class MemoryStore:
 
         doc = Document(
             text=f"Q: {query}\nA: {response}",
-            metadata={"query": query, "response": response}
+            metadata={"session_id": self.session_id, "query": query, "response": response}
         )
-        self.index.insert(doc)
+        self.backend.index.insert(doc)
+
+    def list_history(self, limit: int = 100, offset: int = 0) -> list:
+        """Return stored interactions as text/metadata dicts, read straight from Arrow"""
+        table = getattr(self.backend.vector_store, "table", None)
+        if table is None:
+            return []
+        history = (
+            table.search()
+            .where(f"metadata.session_id = {_sql_string_literal(self.session_id)}")
+            .select(["text", "metadata"])
+            .limit(offset + limit)
+            .to_arrow()
+        )
+        return history.slice(offset, limit).to_pylist()
+
+
+def _sql_string_literal(value: str) -> str:
+    """
+    Quote value as a LanceDB SQL string literal.
+
+    LanceDB filters are SQL text with no parameter binding, so the value is escaped instead: quotes
+    are doubled and control characters, which have no place in a session ID, are rejected.
+    """
+    if any(ord(char) < 32 for char in value):
+        raise ValueError("session_id must not contain control characters")
+    return "'" + value.replace("'", "''") + "'"
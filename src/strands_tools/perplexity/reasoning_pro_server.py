@@ -3,21 +3,131 @@ FastAPI Server for Perplexity Sonar Reasoning Pro
 Implements concise streaming mode from streaming.md lines 434-527
 """
 
+import asyncio
 import os
+import re
+import threading
+import time
 import uuid
-from typing import Dict
-from fastapi import FastAPI, HTTPException
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import orjson
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from memory_store import MemoryBackend, MemoryStore
 from openai import OpenAI
+from pydantic import BaseModel
 
-from memory_store import MemoryStore
+app = FastAPI(title="Perplexity Reasoning Pro Server")
 
+SESSION_MAX_SIZE = int(os.environ.get("REASONING_PRO_SESSION_MAX_SIZE", 10_000))
+SESSION_TTL_SECONDS = float(os.environ.get("REASONING_PRO_SESSION_TTL", 3600))
+# Session IDs name legacy database directories and go into metadata filters, so only plain tokens are accepted
+SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,128}")
+SESSION_SWEEP_INTERVAL_SECONDS = 60
 
-app = FastAPI(title="Perplexity Reasoning Pro Server")
+
+class SessionStore:
+    """
+    Bounded session_id -> MemoryStore map with LRU eviction and idle TTL.
+    Stores hold no handles of their own (the shared backend does), so evicted ones are simply dropped.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[MemoryStore, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return self._get_live(session_id) is not None
+
+    def __getitem__(self, session_id: str) -> MemoryStore:
+        store = self.get(session_id)
+        if store is None:
+            raise KeyError(session_id)
+        return store
+
+    def get(self, session_id: str) -> Optional[MemoryStore]:
+        """Return the live store for session_id and refresh its last access, or None in one locked step"""
+        with self._lock:
+            store = self._get_live(session_id)
+            if store is not None:
+                self._entries[session_id] = (store, time.monotonic())
+                self._entries.move_to_end(session_id)
+            return store
+
+    def __setitem__(self, session_id: str, store: MemoryStore):
+        with self._lock:
+            self._entries.pop(session_id, None)
+            self._entries[session_id] = (store, time.monotonic())
+            while len(self._entries) > self.maxsize:
+                self._evict(next(iter(self._entries)))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def expire(self) -> int:
+        """Drop every session idle for longer than the TTL"""
+        now = time.monotonic()
+        expired = 0
+        with self._lock:
+            # Entries are kept in access order, so the first live one ends the sweep
+            while self._entries:
+                session_id, (_, last_access) = next(iter(self._entries.items()))
+                if now - last_access <= self.ttl:
+                    break
+                self._evict(session_id)
+                expired += 1
+        return expired
+
+    def clear(self):
+        """Drop every session"""
+        with self._lock:
+            while self._entries:
+                self._evict(next(iter(self._entries)))
+
+    def _get_live(self, session_id: str):
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[1] > self.ttl:
+            self._evict(session_id)
+            return None
+        return entry[0]
+
+    def _evict(self, session_id: str):
+        del self._entries[session_id]
+
+
+# One LanceDB connection, table and embedding model shared by every session
+memory_backend = MemoryBackend(db_path="./lancedb_sessions", table_name="chat_history")
 
 # Session storage: session_id -> MemoryStore
-sessions: Dict[str, MemoryStore] = {}
+sessions = SessionStore(maxsize=SESSION_MAX_SIZE, ttl=SESSION_TTL_SECONDS)
+
+
+async def _sweep_sessions():
+    """Periodically expire idle sessions off the request path"""
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL_SECONDS)
+        await asyncio.to_thread(sessions.expire)
+
+
+@app.on_event("startup")
+async def start_session_sweeper():
+    app.state.session_sweeper = asyncio.create_task(_sweep_sessions())
+
+
+@app.on_event("shutdown")
+async def stop_session_sweeper():
+    sweeper = getattr(app.state, "session_sweeper", None)
+    if sweeper is not None:
+        sweeper.cancel()
+    await asyncio.to_thread(sessions.clear)
+    await asyncio.to_thread(memory_backend.close)
 
 
 class ChatStartRequest(BaseModel):
@@ -42,47 +152,66 @@ class ConciseStreamHandler:
         self.search_results = []
         self.images = []
         self.usage = None
+        self._handlers = {
+            "chat.reasoning": self.handle_reasoning,
+            "chat.reasoning.done": self.handle_reasoning_done,
+            "chat.completion.chunk": self.handle_content,
+            "chat.completion.done": self.handle_done,
+        }
 
     def process_chunk(self, chunk):
-        """Route chunk to appropriate handler"""
+        """Route chunk to appropriate handler and return its SSE payload"""
         chunk_type = chunk.object
-
-        if chunk_type == "chat.reasoning":
-            self.handle_reasoning(chunk)
-        elif chunk_type == "chat.reasoning.done":
-            self.handle_reasoning_done(chunk)
-        elif chunk_type == "chat.completion.chunk":
-            self.handle_content(chunk)
-        elif chunk_type == "chat.completion.done":
-            self.handle_done(chunk)
-
-    def handle_reasoning(self, chunk):
+        payload = {"object": chunk_type, "delta": {}}
+        handler = self._handlers.get(chunk_type)
+        if handler is not None:
+            choices = chunk.choices
+            delta = choices[0].delta if choices else None
+            handler(chunk, delta, payload)
+        return payload
+
+    def handle_reasoning(self, chunk, delta, payload):
         """Process reasoning updates"""
-        delta = chunk.choices[0].delta
-
-        if hasattr(delta, 'reasoning_steps'):
-            for step in delta.reasoning_steps:
-                self.reasoning_steps.append(step)
-
-    def handle_reasoning_done(self, chunk):
+        steps = getattr(delta, 'reasoning_steps', None)
+        if steps is not None:
+            self.reasoning_steps.extend(steps)
+            payload["delta"]["reasoning_steps"] = [
+                {"thought": step.thought, "type": step.type}
+                for step in steps
+            ]
+
+    def handle_reasoning_done(self, chunk, delta, payload):
         """Process end of reasoning"""
-        if hasattr(chunk, 'search_results'):
-            self.search_results = chunk.search_results
-
-        if hasattr(chunk, 'images'):
-            self.images = chunk.images
-
-    def handle_content(self, chunk):
+        search_results = getattr(chunk, 'search_results', None)
+        if search_results is not None:
+            self.search_results = search_results
+            payload["search_results"] = [
+                {"title": r.get("title"), "url": r.get("url")}
+                for r in search_results[:5]
+            ]
+
+        images = getattr(chunk, 'images', None)
+        if images is not None:
+            self.images = images
+
+    def handle_content(self, chunk, delta, payload):
         """Process content chunks"""
-        delta = chunk.choices[0].delta
-
-        if hasattr(delta, 'content') and delta.content:
-            self.content += delta.content
+        content = getattr(delta, 'content', None)
+        if content is not None:
+            if content:
+                self.content += content
+            payload["delta"]["content"] = content
 
-    def handle_done(self, chunk):
+    def handle_done(self, chunk, delta, payload):
         """Process completion"""
-        if hasattr(chunk, 'usage'):
-            self.usage = chunk.usage
+        usage = getattr(chunk, 'usage', None)
+        if usage is not None:
+            self.usage = usage
+            payload["usage"] = {
+                "total_tokens": usage.total_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "prompt_tokens": usage.prompt_tokens
+            }
 
     def get_result(self):
         """Return complete result"""
@@ -111,16 +240,17 @@ def create_perplexity_client():
 def start_chat_session(request: ChatStartRequest):
     """Initialize LanceDB session"""
     session_id = request.session_id or str(uuid.uuid4())
+    if not SESSION_ID_PATTERN.fullmatch(session_id):
+        raise HTTPException(status_code=400, detail="session_id must be 1-128 letters, digits, underscores or hyphens.")
 
     if session_id in sessions:
         return {"session_id": session_id, "status": "existing"}
 
-    # Create new memory store for session
-    memory_store = MemoryStore(
-        db_path=f"./lancedb_sessions/{session_id}",
-        table_name="chat_history"
-    )
-    sessions[session_id] = memory_store
+    # Bring over history kept in this session's database from the per-session layout, if any
+    memory_backend.import_legacy_session(session_id)
+
+    # Bind new session to the shared memory backend
+    sessions[session_id] = MemoryStore(session_id=session_id, backend=memory_backend)
 
     return {"session_id": session_id, "status": "created"}
 
@@ -128,11 +258,11 @@ def start_chat_session(request: ChatStartRequest):
 @app.post("/chat/stream")
 async def stream_chat(request: ChatStreamRequest):
     """Stream with concise mode + memory retrieval"""
-    if request.session_id not in sessions:
+    # A single lookup: the session may be evicted at any moment, so check and fetch together
+    memory_store = sessions.get(request.session_id)
+    if memory_store is None:
         raise HTTPException(status_code=404, detail="Session not found. Call /chat/start first.")
 
-    memory_store = sessions[request.session_id]
-
     # Retrieve top 3 relevant historical interactions
     context_nodes = memory_store.retrieve_context(request.query, top_k=3)
     context_text = "\n".join([node.text for node in context_nodes])
@@ -165,71 +295,35 @@ async def stream_chat(request: ChatStreamRequest):
                 stream_mode="concise"
             )
 
-            # Process each chunk
+            # Process each chunk and stream its payload to client as SSE
             for chunk in stream:
-                handler.process_chunk(chunk)
-
-                # Stream chunk to client as SSE
-                chunk_data = {
-                    "object": chunk.object,
-                    "delta": {}
-                }
-
-                if chunk.object == "chat.reasoning":
-                    if hasattr(chunk.choices[0].delta, 'reasoning_steps'):
-                        chunk_data["delta"]["reasoning_steps"] = [
-                            {"thought": step.thought, "type": step.type}
-                            for step in chunk.choices[0].delta.reasoning_steps
-                        ]
-
-                elif chunk.object == "chat.reasoning.done":
-                    if hasattr(chunk, 'search_results'):
-                        chunk_data["search_results"] = [
-                            {"title": r.get("title"), "url": r.get("url")}
-                            for r in chunk.search_results[:5]
-                        ]
-
-                elif chunk.object == "chat.completion.chunk":
-                    if hasattr(chunk.choices[0].delta, 'content'):
-                        chunk_data["delta"]["content"] = chunk.choices[0].delta.content
-
-                elif chunk.object == "chat.completion.done":
-                    if hasattr(chunk, 'usage'):
-                        chunk_data["usage"] = {
-                            "total_tokens": chunk.usage.total_tokens,
-                            "completion_tokens": chunk.usage.completion_tokens,
-                            "prompt_tokens": chunk.usage.prompt_tokens
-                        }
-
-                yield f"data: {chunk_data}\n\n"
+                payload = handler.process_chunk(chunk)
+                if payload:
+                    yield b"data: " + orjson.dumps(payload) + b"\n\n"
+                    await asyncio.sleep(0)
 
             # Store interaction in memory
             result = handler.get_result()
             memory_store.store_interaction(request.query, result['content'])
 
-            yield "data: [DONE]\n\n"
+            yield b"data: [DONE]\n\n"
 
         except Exception as e:
-            yield f"data: {{\"error\": \"{str(e)}\"}}\n\n"
+            yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
 
     return StreamingResponse(generate(), media_type="text/event-stream")
 
 
 @app.get("/chat/history/{session_id}")
-def get_chat_history(session_id: str):
+def get_chat_history(session_id: str, limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
     """Retrieve conversation history"""
-    if session_id not in sessions:
+    memory_store = sessions.get(session_id)
+    if memory_store is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    memory_store = sessions[session_id]
-
-    # Retrieve all stored conversations
     try:
-        import lancedb
-        db = lancedb.connect(f"./lancedb_sessions/{session_id}")
-        table = db.open_table("chat_history")
-        history = table.to_pandas()[["text", "metadata"]].to_dict(orient="records")
-        return {"session_id": session_id, "history": history}
+        history = memory_store.list_history(limit=limit, offset=offset)
+        return {"session_id": session_id, "history": history, "limit": limit, "offset": offset}
     except Exception as e:
         return {"session_id": session_id, "history": [], "error": str(e)}
 
@@ -134,3 +134,550 @@ def test_local_chromium_browser_close_platform():
     browser = LocalChromiumBrowser()
     # Should not raise any exceptions
     browser.close_platform()
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_cdp_connect_retries_with_backoff():
+    """Test CDP connect retries transient failures with growing delays."""
+    mock_playwright_instance = Mock()
+    mock_cdp_browser = Mock()
+    mock_cdp_browser.contexts = []
+    mock_playwright_instance.chromium.connect_over_cdp = AsyncMock(
+        side_effect=[ConnectionRefusedError("ECONNREFUSED"), ConnectionRefusedError("ECONNREFUSED"), mock_cdp_browser]
+    )
+
+    browser = LocalChromiumBrowser()
+    browser._playwright = mock_playwright_instance
+    browser._default_launch_options = {"cdp_url": "http://localhost:9222"}
+
+    with patch("strands_tools.browser.local_chromium_browser.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        result = await browser.create_browser_session()
+
+    assert result == mock_cdp_browser
+    assert mock_playwright_instance.chromium.connect_over_cdp.await_count == 3
+    delays = [call.args[0] for call in mock_sleep.await_args_list]
+    assert len(delays) == 2
+    assert delays[0] < delays[1]
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_cdp_connect_fails_fast_on_fatal_error():
+    """Test CDP connect does not retry errors that retrying cannot fix."""
+    mock_playwright_instance = Mock()
+    mock_playwright_instance.chromium.connect_over_cdp = AsyncMock(side_effect=Exception("401 Unauthorized"))
+
+    browser = LocalChromiumBrowser()
+    browser._playwright = mock_playwright_instance
+    browser._default_launch_options = {"cdp_url": "http://localhost:9222"}
+
+    with patch("strands_tools.browser.local_chromium_browser.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        with pytest.raises(Exception, match="401 Unauthorized"):
+            await browser.create_browser_session()
+
+    mock_playwright_instance.chromium.connect_over_cdp.assert_awaited_once()
+    mock_sleep.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_shell_page_cache_cleared_on_close():
+    """Test the cached shell page is reused and dropped once the page closes."""
+    shell_page = Mock()
+    shell_page.is_closed.return_value = False
+    shell_page.evaluate = AsyncMock()
+
+    browser = LocalChromiumBrowser()
+    browser._remember_shell_page(shell_page)
+
+    assert await browser._get_shell_page() is shell_page
+    shell_page.evaluate.assert_not_awaited()
+
+    event, on_close = shell_page.once.call_args.args
+    assert event == "close"
+    on_close(shell_page)
+    assert browser._cached_shell_page is None
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_first_shell_page_probes_concurrently():
+    """Test shell detection waits on every page and returns the one that exposes window.electron."""
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    content_page = Mock()
+    content_page.wait_for_function = AsyncMock(side_effect=PlaywrightTimeoutError("timeout"))
+    broken_page = Mock()
+    broken_page.wait_for_function = AsyncMock(side_effect=Exception("Target closed"))
+    shell_page = Mock()
+    shell_page.wait_for_function = AsyncMock()
+
+    browser = LocalChromiumBrowser()
+
+    assert await browser._first_shell_page([content_page, broken_page, shell_page], timeout=2.0) is shell_page
+    shell_page.wait_for_function.assert_awaited_once_with("() => !!window.electron", timeout=2000.0)
+    assert await browser._first_shell_page([content_page, broken_page], timeout=1.0) is None
+    assert await browser._first_shell_page([], timeout=1.0) is None
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_reacquire_shell_probes_once_without_waiting():
+    """Test re-acquiring the shell checks each page once instead of waiting for a preload."""
+    content_page = Mock()
+    content_page.url = "https://example.com/"
+    content_page.evaluate = AsyncMock(return_value=False)
+    content_page.wait_for_function = AsyncMock()
+    shell_page = Mock()
+    shell_page.url = "http://localhost:3000/"
+    shell_page.evaluate = AsyncMock(return_value=True)
+    shell_page.wait_for_function = AsyncMock()
+    session = Mock()
+    session.context.pages = [content_page, shell_page]
+
+    browser = LocalChromiumBrowser()
+    browser._sessions = {"main": session}
+
+    assert await browser._get_shell_page() is shell_page
+    content_page.evaluate.assert_awaited_once_with("() => !!window.electron")
+    content_page.wait_for_function.assert_not_awaited()
+    shell_page.wait_for_function.assert_not_awaited()
+
+    session.context.pages = [content_page]
+    browser._cached_shell_page = None
+    assert await browser._get_shell_page() is None
+    content_page.wait_for_function.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_batch_actions_resolves_pages_once():
+    """Test batched actions share one shell lookup and one content lookup."""
+    from strands_tools.browser.models import ClickAction, TypeAction
+
+    shell_page = Mock()
+    content_page = Mock()
+    content_page.click = AsyncMock()
+    content_page.fill = AsyncMock()
+
+    browser = LocalChromiumBrowser()
+    browser._get_shell_page = AsyncMock(return_value=shell_page)
+    browser._get_active_content_page = AsyncMock(return_value=content_page)
+
+    results = await browser.batch_actions(
+        [
+            ClickAction(type="click", selector="#search", session_name="main"),
+            TypeAction(type="type", selector="#search", text="query", session_name="main"),
+        ]
+    )
+
+    assert [result["status"] for result in results] == ["success", "success"]
+    browser._get_shell_page.assert_awaited_once()
+    browser._get_active_content_page.assert_awaited_once_with(shell_page)
+    content_page.click.assert_awaited_once_with("#search")
+    content_page.fill.assert_awaited_once_with("#search", "query")
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_known_shell_page_skips_probe():
+    """Test a page previously identified as the shell is re-acquired without evaluate."""
+    shell_page = Mock()
+    shell_page.is_closed.return_value = False
+    shell_page.evaluate = AsyncMock(return_value=True)
+    session = Mock()
+    session.context.pages = [shell_page]
+
+    browser = LocalChromiumBrowser()
+    browser._sessions = {"main": session}
+    browser._remember_shell_page(shell_page)
+    browser._cached_shell_page = None
+
+    assert await browser._get_shell_page() is shell_page
+    shell_page.evaluate.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_context_page_listener_added_once():
+    """Test preparing a context again (new session, reconnect) does not add a second page listener."""
+    context = Mock()
+    context.pages = []
+    context.add_init_script = AsyncMock()
+
+    browser = LocalChromiumBrowser()
+    await browser._prepare_context(context)
+    await browser._prepare_context(context)
+
+    context.on.assert_called_once_with("page", browser._index_page)
+
+
+def test_local_chromium_browser_page_url_index_follows_navigation():
+    """Test the URL index tracks main-frame navigation and page close."""
+    page = Mock()
+    page.url = "https://example.com/"
+    page.is_closed.return_value = False
+    handlers = {}
+    page.on.side_effect = lambda event, handler: handlers.__setitem__(event, handler)
+    page.once.side_effect = lambda event, handler: handlers.__setitem__(event, handler)
+
+    browser = LocalChromiumBrowser()
+    browser._index_page(page)
+    assert browser._lookup_page_by_url("https://example.com") is page
+
+    page.url = "https://example.org/docs"
+    handlers["framenavigated"](Mock(parent_frame=None, url=page.url))
+    assert browser._lookup_page_by_url("https://example.org/docs/") is page
+    assert browser._lookup_page_by_url("https://example.com") is None
+
+    handlers["close"](page)
+    assert browser._lookup_page_by_url("https://example.org/docs") is None
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_waits_for_first_page_event():
+    """Test an empty CDP context waits for its page event before opening a page."""
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    page = Mock()
+    context = Mock()
+    context.wait_for_event = AsyncMock(return_value=page)
+    context.new_page = AsyncMock()
+
+    browser = LocalChromiumBrowser()
+    assert await browser._wait_for_first_page(context) is page
+    context.new_page.assert_not_awaited()
+
+    context.wait_for_event = AsyncMock(side_effect=PlaywrightTimeoutError("timeout"))
+    context.new_page = AsyncMock(return_value=page)
+    assert await browser._wait_for_first_page(context) is page
+    context.new_page.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_first_page_watch_starts_on_connect():
+    """Test the first-page wait started at CDP connect is reused by session setup."""
+    page = Mock()
+    context = Mock()
+    context.pages = []
+    context.wait_for_event = AsyncMock(return_value=page)
+    cdp_browser = Mock()
+    cdp_browser.contexts = [context]
+    mock_playwright_instance = Mock()
+    mock_playwright_instance.chromium.connect_over_cdp = AsyncMock(return_value=cdp_browser)
+
+    browser = LocalChromiumBrowser()
+    browser._playwright = mock_playwright_instance
+    browser._default_launch_options = {"cdp_url": "http://localhost:9222"}
+
+    await browser.create_browser_session()
+    context.wait_for_event.assert_called_once()
+
+    assert await browser._wait_for_first_page(context) is page
+    context.wait_for_event.assert_called_once()
+    assert browser._pending_first_page is None
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_navigate_waits_for_active_tab_load():
+    """Test navigate dispatches through the shell inside the known content page's navigation wait."""
+    import time
+    from contextlib import asynccontextmanager
+
+    from strands_tools.browser.models import NavigateAction
+
+    events = []
+
+    @asynccontextmanager
+    async def expect_navigation(**kwargs):
+        events.append(("wait", kwargs["wait_until"]))
+        yield
+        events.append(("loaded", None))
+
+    shell_page = Mock()
+    shell_page.evaluate = AsyncMock(side_effect=lambda *args: events.append(("navigate", args[1])))
+    content_page = Mock()
+    content_page.url = "https://example.com/"
+    content_page.is_closed.return_value = False
+    content_page.expect_navigation = expect_navigation
+
+    browser = LocalChromiumBrowser()
+    browser._get_shell_page = AsyncMock(return_value=shell_page)
+    browser._get_active_content_page = AsyncMock(return_value=content_page)
+    browser._cached_content_page = ("https://example.com/", content_page, time.monotonic())
+
+    result = await browser._async_navigate(
+        NavigateAction(type="navigate", url="https://example.com/a'b", session_name="main")
+    )
+
+    assert result["status"] == "success"
+    assert events == [("wait", "load"), ("navigate", "https://example.com/a'b"), ("loaded", None)]
+    browser._get_active_content_page.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_navigate_skips_load_wait_when_not_needed():
+    """Test navigate neither looks up the content page nor waits for load on fragment-only changes."""
+    import time
+
+    from strands_tools.browser.models import NavigateAction
+
+    shell_page = Mock()
+    shell_page.evaluate = AsyncMock()
+    content_page = Mock()
+    content_page.url = "https://example.com/docs"
+    content_page.is_closed.return_value = False
+    content_page.expect_navigation = Mock(side_effect=AssertionError("should not wait for load"))
+
+    browser = LocalChromiumBrowser()
+    browser._get_shell_page = AsyncMock(return_value=shell_page)
+    browser._get_active_content_page = AsyncMock(return_value=content_page)
+
+    result = await browser._async_navigate(
+        NavigateAction(type="navigate", url="https://example.com/", session_name="main")
+    )
+    assert result["status"] == "success"
+    browser._get_active_content_page.assert_not_awaited()
+
+    browser._cached_content_page = ("https://example.com/docs", content_page, time.monotonic())
+    result = await browser._async_navigate(
+        NavigateAction(type="navigate", url="https://example.com/docs#install", session_name="main")
+    )
+    assert result["status"] == "success"
+    assert shell_page.evaluate.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_session_setup_prepares_each_context_once():
+    """Test repeated CDP session setup registers the page listener and init script only once per context."""
+    from playwright.async_api import Browser as PlaywrightBrowser
+
+    shell_page = Mock()
+    shell_page.url = "file:///app/index.html"
+    shell_page.wait_for_function = AsyncMock()
+    context = Mock()
+    context.pages = [shell_page]
+    context.add_init_script = AsyncMock()
+    cdp_browser = Mock(spec=PlaywrightBrowser)
+    cdp_browser.contexts = [context]
+
+    browser = LocalChromiumBrowser()
+    browser._default_launch_options = {"cdp_url": "http://localhost:9222"}
+
+    for _ in range(2):
+        assert await browser._setup_session_from_browser(cdp_browser) == (cdp_browser, context, shell_page)
+
+    context.add_init_script.assert_awaited_once()
+    context.on.assert_called_once_with("page", browser._index_page)
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_reconnects_after_cdp_disconnect():
+    """Test an unexpected CDP disconnect reconnects and re-attaches the session."""
+    from strands_tools.browser.models import BrowserSession
+
+    old_browser = Mock()
+    old_browser.contexts = []
+    new_browser = Mock()
+    new_browser.contexts = []
+    new_page = Mock()
+    new_context = Mock()
+    mock_playwright_instance = Mock()
+    mock_playwright_instance.chromium.connect_over_cdp = AsyncMock(
+        side_effect=[ConnectionRefusedError("ECONNREFUSED"), new_browser]
+    )
+
+    browser = LocalChromiumBrowser()
+    browser._playwright = mock_playwright_instance
+    browser._default_launch_options = {"cdp_url": "http://localhost:9222"}
+    browser._on_cdp_connected(old_browser)
+    browser._sessions = {"main": BrowserSession(session_name="main", description="", browser=old_browser)}
+    browser._setup_session_from_browser = AsyncMock(return_value=(new_browser, new_context, new_page))
+
+    with patch("strands_tools.browser.local_chromium_browser.asyncio.sleep", new=AsyncMock()):
+        browser._on_cdp_disconnected(old_browser)
+        assert browser.cdp_state == "reconnecting"
+        assert await browser._get_shell_page() is None
+        await browser._reconnect_task
+
+    assert browser.cdp_state == "connected"
+    assert browser._cdp_browser is new_browser
+    session = browser._sessions["main"]
+    assert session.browser is new_browser
+    assert session.context is new_context
+    assert session.get_active_page() is new_page
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_shell_page_url_only_orders_probes():
+    """Test a shell-like URL is probed first but never taken as the shell without window.electron."""
+    shell_page = Mock()
+    shell_page.url = "file:///Applications/Ron.app/index.html"
+    shell_page.evaluate = AsyncMock(return_value=True)
+    content_page = Mock()
+    content_page.url = "https://example.com/"
+    content_page.evaluate = AsyncMock(return_value=False)
+    session = Mock()
+    session.context.pages = [content_page, shell_page]
+
+    browser = LocalChromiumBrowser()
+    browser._sessions = {"main": session}
+
+    assert await browser._get_shell_page() is shell_page
+    shell_page.evaluate.assert_awaited_once_with("() => !!window.electron")
+    content_page.evaluate.assert_not_awaited()
+
+    local_file = Mock()
+    local_file.url = "file:///tmp/report.html"
+    local_file.evaluate = AsyncMock(return_value=False)
+    session.context.pages = [local_file]
+    browser._cached_shell_page = None
+    browser._shell_pages.discard(shell_page)
+
+    assert await browser._get_shell_page() is None
+    assert browser._cached_shell_page is None
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_cdp_connect_gives_up_after_max_wait():
+    """Test CDP connect raises without a trailing sleep once the time budget is spent."""
+    mock_playwright_instance = Mock()
+    mock_playwright_instance.chromium.connect_over_cdp = AsyncMock(side_effect=ConnectionRefusedError("ECONNREFUSED"))
+
+    browser = LocalChromiumBrowser()
+    browser._playwright = mock_playwright_instance
+    browser._default_launch_options = {"cdp_url": "http://localhost:9222"}
+
+    with (
+        patch("strands_tools.browser.local_chromium_browser.CDP_CONNECT_MAX_WAIT", 0),
+        patch("strands_tools.browser.local_chromium_browser.asyncio.sleep", new=AsyncMock()) as mock_sleep,
+    ):
+        with pytest.raises(RuntimeError, match="Is Electron running"):
+            await browser.create_browser_session()
+
+    mock_playwright_instance.chromium.connect_over_cdp.assert_awaited_once()
+    mock_sleep.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_active_tab_url_installs_shell_helpers_once():
+    """Test the active tab URL lookup installs the shell helpers only when the document lacks them."""
+    from playwright.async_api import Error as PlaywrightError
+
+    shell_page = Mock()
+    shell_page.evaluate = AsyncMock(
+        side_effect=[
+            PlaywrightError("TypeError: window.__strandsActiveTabUrl is not a function"),
+            None,
+            "https://example.com",
+            "https://example.com",
+        ]
+    )
+
+    browser = LocalChromiumBrowser()
+    assert await browser._read_active_tab_url(shell_page) == "https://example.com"
+    assert shell_page.evaluate.await_count == 3
+
+    assert await browser._read_active_tab_url(shell_page) == "https://example.com"
+    assert shell_page.evaluate.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_active_page_cached_briefly():
+    """Test back-to-back lookups reuse the content page until the TTL passes or a tab action invalidates it."""
+    shell_page = Mock()
+    content_page = Mock()
+    content_page.url = "https://example.com/"
+    content_page.is_closed.return_value = False
+    session = Mock()
+    session.context.pages = [shell_page, content_page]
+
+    browser = LocalChromiumBrowser()
+    browser._sessions = {"main": session}
+    browser._read_active_tab_url = AsyncMock(return_value="https://example.com")
+
+    assert await browser._get_active_content_page(shell_page) is content_page
+    assert await browser._get_active_content_page(shell_page) is content_page
+    assert browser._read_active_tab_url.await_count == 1
+
+    browser._invalidate_content_page()
+    assert await browser._get_active_content_page(shell_page) is content_page
+    assert browser._read_active_tab_url.await_count == 2
+
+    with patch("strands_tools.browser.local_chromium_browser.ACTIVE_PAGE_CACHE_TTL", 0):
+        assert await browser._get_active_content_page(shell_page) is content_page
+    assert browser._read_active_tab_url.await_count == 3
+
+
+def test_local_chromium_browser_save_screenshot_forces_jpg_under_screenshots_dir(tmp_path):
+    """Test relative screenshot paths land in the screenshots dir with a .jpg extension."""
+    from strands_tools.browser.local_chromium_browser import _save_screenshot
+
+    with patch.dict(os.environ, {"STRANDS_BROWSER_SCREENSHOTS_DIR": str(tmp_path / "shots")}):
+        path = _save_screenshot("page.png", b"jpeg-bytes")
+
+    assert path == str(tmp_path / "shots" / "page.jpg")
+    with open(path, "rb") as f:
+        assert f.read() == b"jpeg-bytes"
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_batch_dispatches_consecutive_tab_actions_once():
+    """Test consecutive tab actions in a batch reach the shell as one dispatch evaluate."""
+    from strands_tools.browser.models import NewTabAction, SwitchTabAction
+
+    shell_page = Mock()
+    shell_page.evaluate = AsyncMock(return_value=[None, "no such tab"])
+
+    browser = LocalChromiumBrowser()
+    browser._get_shell_page = AsyncMock(return_value=shell_page)
+
+    results = await browser.batch_actions(
+        [
+            NewTabAction(type="new_tab", session_name="main"),
+            SwitchTabAction(type="switch_tab", session_name="main", tab_id="tab-9"),
+        ]
+    )
+
+    shell_page.evaluate.assert_awaited_once()
+    assert shell_page.evaluate.await_args.args[1] == [("tabs", "create", []), ("tabs", "switch", ["tab-9"])]
+    assert results[0] == {"status": "success", "content": [{"text": "Created new tab via App API"}]}
+    assert results[1] == {"status": "error", "content": [{"text": "Failed to switch tab: no such tab"}]}
+
+
+def test_local_chromium_browser_cdp_error_classification():
+    """Test only transient connection errors are retried when connecting over CDP."""
+    import errno
+
+    from strands_tools.browser.local_chromium_browser import _is_fatal_cdp_error
+
+    assert not _is_fatal_cdp_error(ConnectionRefusedError(errno.ECONNREFUSED, "refused"))
+    assert not _is_fatal_cdp_error(OSError(errno.ENETUNREACH, "unreachable"))
+    assert not _is_fatal_cdp_error(Exception("connect ECONNREFUSED 127.0.0.1:9222"))
+    assert _is_fatal_cdp_error(OSError(errno.EACCES, "permission denied"))
+    assert _is_fatal_cdp_error(Exception("Protocol error (Browser.getVersion): Unsupported endpoint"))
+
+
+def test_local_chromium_browser_cdp_status_codes_match_whole_tokens():
+    """Test 401/403 are fatal only as status codes, not inside ports or numbers."""
+    from strands_tools.browser.local_chromium_browser import _is_fatal_cdp_error
+
+    assert _is_fatal_cdp_error(Exception("WebSocket error: 401 Unauthorized"))
+    assert _is_fatal_cdp_error(Exception("Unexpected server response: 403"))
+    http_error = Exception("handshake rejected")
+    http_error.status = 403
+    assert _is_fatal_cdp_error(http_error)
+    assert not _is_fatal_cdp_error(Exception("connect ECONNREFUSED 127.0.0.1:9401"))
+    assert not _is_fatal_cdp_error(Exception("connect ECONNREFUSED 10.0.0.4:4030"))
+    assert not _is_fatal_cdp_error(Exception("Protocol error (Target.attachToTarget): Target closed"))
+
+
+@pytest.mark.asyncio
+async def test_local_chromium_browser_switch_tab_rejects_non_scalar_tab_id():
+    """Test a tab id that is not a string or integer never reaches the shell."""
+    from strands_tools.browser.models import SwitchTabAction
+
+    shell_page = Mock()
+    shell_page.evaluate = AsyncMock()
+    browser = LocalChromiumBrowser()
+    browser._get_shell_page = AsyncMock(return_value=shell_page)
+
+    action = SwitchTabAction.model_construct(type="switch_tab", session_name="main", tab_id={"id": 1})
+    result = await browser._async_switch_tab(action)
+
+    assert result["status"] == "error"
+    assert "Invalid tab id" in result["content"][0]["text"]
+    shell_page.evaluate.assert_not_awaited()
@@ -613,6 +613,23 @@ def test_execute_command_success(interpreter, mock_client):
     mock_client.invoke.assert_called_once_with("executeCommand", {"command": "ls -la"})
 
 
+def test_execute_command_with_env(interpreter, mock_client):
+    """Test command execution passes extra environment variables through env(1)."""
+    session_info = SessionInfo(session_id="test-session-id-123", description="Test session", client=mock_client)
+    interpreter._sessions["test-session"] = session_info
+
+    action = ExecuteCommandAction(
+        type="executeCommand", session_name="test-session", command="echo $GREETING", env={"GREETING": "hi there"}
+    )
+
+    result = interpreter.execute_command(action)
+
+    assert result["status"] == "success"
+    mock_client.invoke.assert_called_once_with(
+        "executeCommand", {"command": "env 'GREETING=hi there' sh -c 'echo $GREETING'"}
+    )
+
+
 def test_execute_command_session_not_found():
     """Test command execution with non-existent session when auto_create is disabled."""
     with patch("strands_tools.code_interpreter.agent_core_code_interpreter.resolve_region") as mock_resolve:
@@ -51,7 +51,7 @@ class MockCodeInterpreter(CodeInterpreter):
             ],
         }
 
-    def list_local_sessions(self) -> Dict[str, Any]:
+    def list_local_sessions(self, include_meta: bool = False) -> Dict[str, Any]:
         return {"status": "success", "content": [{"json": {"sessions": [], "totalSessions": 0}}]}
 
     def execute_code(self, action: ExecuteCodeAction) -> Dict[str, Any]:
@@ -126,6 +126,18 @@ def test_init_session_dict_input(mock_interpreter):
     assert result["content"][0]["json"]["sessionName"] == "dict-session"
 
 
+def test_init_sessions_defaults_to_one_init_session_per_name(mock_interpreter):
+    """Test that initSession with session_names initializes each named session."""
+    action_dict = {"action": {"type": "initSession", "description": "Bulk", "session_names": ["a", "b", "a"]}}
+
+    with patch.object(mock_interpreter, "init_session", wraps=mock_interpreter.init_session) as mock_init:
+        result = mock_interpreter.code_interpreter(action_dict)
+
+    assert result["status"] == "success"
+    assert [call.args[0].session_name for call in mock_init.call_args_list] == ["a", "b"]
+    assert all(call.args[0].description == "Bulk" for call in mock_init.call_args_list)
+
+
 def test_list_local_sessions_action(mock_interpreter):
     """Test list local sessions action."""
     action_input = CodeInterpreterInput(action=ListLocalSessionsAction(type="listLocalSessions"))
@@ -219,6 +231,16 @@ def test_write_files_action(mock_interpreter):
     assert result["content"][0]["json"]["filesWritten"] == 2
 
 
+def test_copy_file_unsupported_by_default(mock_interpreter):
+    """Test that platforms without copy_file report copyFile as unsupported."""
+    action_input = {"action": {"type": "copyFile", "source": "a.txt", "destination": "b.txt"}}
+
+    result = mock_interpreter.code_interpreter(action_input)
+
+    assert result["status"] == "error"
+    assert "copyFile is not supported" in result["content"][0]["text"]
+
+
 def test_unknown_action_type(mock_interpreter):
     """Test handling of unknown action type."""
     with patch("strands_tools.code_interpreter.models.CodeInterpreterInput.model_validate") as mock_validate:
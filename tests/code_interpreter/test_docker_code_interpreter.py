@@ -0,0 +1,130 @@
+"""
+Tests for the DockerCodeInterpreter persistent shell channel.
+
+The docker exec shell is replaced by a local sh, so the framing, exit codes and
+output handling run for real without Docker.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+from strands_tools.code_interpreter import docker_code_interpreter
+from strands_tools.code_interpreter.docker_code_interpreter import DockerCodeInterpreter
+from strands_tools.code_interpreter.models import CopyFileAction, ExecuteCommandAction
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="needs a POSIX sh")
+
+
+def _local_shell(self):
+    """Stand-in for _ensure_shell: a plain sh instead of docker exec, restarted the same way."""
+    if self._shell is None or self._shell.poll() is not None:
+        self._close_shell()
+        self._shell = subprocess.Popen(
+            ["sh"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0
+        )
+    return self._shell
+
+
+@pytest.fixture
+def interpreter(tmp_path, monkeypatch):
+    monkeypatch.setattr(DockerCodeInterpreter, "_ensure_shell", _local_shell)
+    monkeypatch.setattr(DockerCodeInterpreter, "start_platform", lambda self: None)
+    interpreter = DockerCodeInterpreter(workspace_dir=str(tmp_path))
+    yield interpreter
+    interpreter.cleanup_platform()
+
+
+def test_run_in_shell_reports_exit_codes(interpreter):
+    assert interpreter._run_in_shell("true", timeout=5) == (0, "", "")
+    assert interpreter._run_in_shell("(exit 3)", timeout=5) == (3, "", "")
+    # The same shell keeps serving calls after a failing command
+    assert interpreter._run_in_shell("echo ok", timeout=5) == (0, "ok\n", "")
+
+
+def test_run_in_shell_separates_stderr(interpreter):
+    assert interpreter._run_in_shell("echo out; echo err >&2", timeout=5) == (0, "out\n", "err\n")
+
+
+def test_run_in_shell_output_without_trailing_newline(interpreter):
+    assert interpreter._run_in_shell("printf abc; printf def >&2", timeout=5) == (0, "abc", "def")
+
+
+def test_run_in_shell_truncates_large_output(interpreter, monkeypatch):
+    monkeypatch.setattr(docker_code_interpreter, "MAX_OUTPUT_BYTES", 1000)
+
+    code, stdout, stderr = interpreter._run_in_shell("head -c 50000 /dev/zero | tr '\\0' x", timeout=5)
+
+    assert code == 0
+    assert stdout == "x" * 1000 + "\n[output truncated]"
+    assert stderr == ""
+
+
+def test_run_in_shell_recovers_when_shell_dies_mid_command(interpreter):
+    code, stdout, _ = interpreter._run_in_shell("echo before; kill -9 $$", timeout=5)
+
+    assert code == -1
+    assert stdout == "before\n"
+    assert interpreter._shell is None
+    assert interpreter._run_in_shell("echo after", timeout=5) == (0, "after\n", "")
+
+
+def test_run_in_shell_times_out_and_replaces_shell(interpreter):
+    assert interpreter._run_in_shell("sleep 5", timeout=0.2) == (None, "", "")
+    assert interpreter._shell is None
+    assert interpreter._run_in_shell("echo again", timeout=5) == (0, "again\n", "")
+
+
+def test_execute_command_through_shell(interpreter):
+    result = interpreter.execute_command(
+        ExecuteCommandAction(type="executeCommand", command='echo "$GREETING"; exit 2', env={"GREETING": "hi there"})
+    )
+
+    assert result == {"status": "error", "content": [{"text": "STDOUT:\nhi there\n\n"}]}
+
+
+def test_copy_file_within_workspace(interpreter, tmp_path):
+    (tmp_path / "data.csv").write_text("a,b\n1,2\n")
+
+    result = interpreter.code_interpreter(
+        {"action": {"type": "copyFile", "source": "data.csv", "destination": "backup/data.csv"}}
+    )
+
+    assert result["status"] == "success"
+    assert (tmp_path / "backup" / "data.csv").read_text() == "a,b\n1,2\n"
+
+
+def test_copy_file_rejects_paths_outside_workspace(interpreter, tmp_path):
+    (tmp_path / "data.csv").write_text("x")
+
+    result = interpreter.copy_file(CopyFileAction(type="copyFile", source="data.csv", destination="../escaped.csv"))
+
+    assert result == {"status": "error", "content": [{"text": "Path is outside the workspace"}]}
+    assert not (tmp_path.parent / "escaped.csv").exists()
+
+
+@pytest.mark.parametrize("destination", ["data.csv", "./sub/../data.csv"])
+def test_copy_file_onto_itself_keeps_the_data(interpreter, tmp_path, destination):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "data.csv").write_text("a,b\n")
+
+    result = interpreter.copy_file(CopyFileAction(type="copyFile", source="data.csv", destination=destination))
+
+    assert result["status"] == "error"
+    assert "same file" in result["content"][0]["text"]
+    assert (tmp_path / "data.csv").read_text() == "a,b\n"
+
+
+def test_init_sessions_and_list_with_meta(interpreter):
+    result = interpreter.code_interpreter(
+        {"action": {"type": "initSession", "description": "Bulk", "session_names": ["a", "b"]}}
+    )
+    assert result["status"] == "success"
+
+    listing = interpreter.code_interpreter({"action": {"type": "listLocalSessions"}})
+    with_meta = interpreter.code_interpreter({"action": {"type": "listLocalSessions", "include_meta": True}})
+
+    assert listing["content"][0]["json"][-2:] == ["a", "b"]
+    assert with_meta["content"][0]["json"]["a"] == {"cwd": "/workspace"}
+    assert set(with_meta["content"][0]["json"]) == set(listing["content"][0]["json"])
@@ -0,0 +1,126 @@
+"""
+Tests for the ElectronCodeInterpreter bridge to the Electron app.
+"""
+
+import asyncio
+import json
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from strands_tools.code_interpreter.electron_code_interpreter import ElectronCodeInterpreter
+from strands_tools.code_interpreter.models import ExecuteCodeAction, LanguageType
+
+
+class FakeBrowser:
+    """Browser whose async evaluate answers each batched call with an ExecutionResult echoing its code."""
+
+    def __init__(self, limit=None, error=None):
+        self.scripts = []
+        self.limit = limit
+        self.error = error
+
+    async def evaluate(self, action):
+        await asyncio.sleep(0)
+        self.scripts.append(action.script)
+        if self.error is not None:
+            raise self.error
+        calls = json.loads(re.search(r"for \(const args of (\[.*\])\) \{", action.script).group(1))
+        results = [
+            {"success": True, "result": {"status": "success", "content": [{"text": call["code"]}]}}
+            for call in calls[: self.limit]
+        ]
+        return {"status": "success", "content": [{"text": f"Evaluation result: {json.dumps(results)}"}]}
+
+
+def _queue(interpreter, code):
+    future = Future()
+    interpreter._pending.append((future, {"code": code}))
+    return future
+
+
+def _execute(interpreter, code):
+    return interpreter.execute_code(ExecuteCodeAction(type="executeCode", code=code, language=LanguageType.PYTHON))
+
+
+def test_electron_code_interpreter_awaits_async_browser_evaluate():
+    browser = FakeBrowser()
+    interpreter = ElectronCodeInterpreter(browser)
+
+    result = _execute(interpreter, "print(1)")
+
+    assert result == {"status": "success", "content": [{"text": "print(1)"}]}
+    assert len(browser.scripts) == 1
+
+
+def test_electron_code_interpreter_runs_evaluate_on_browser_loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        browser = FakeBrowser()
+        interpreter = ElectronCodeInterpreter(browser, loop=loop)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda i: _execute(interpreter, f"x = {i}"), range(8)))
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    assert [result["content"][0]["text"] for result in results] == [f"x = {i}" for i in range(8)]
+    assert 1 <= len(browser.scripts) <= 8
+    assert not interpreter._flushing
+
+
+def test_electron_code_interpreter_resends_calls_the_page_did_not_start():
+    browser = FakeBrowser(limit=1)
+    interpreter = ElectronCodeInterpreter(browser)
+    futures = [_queue(interpreter, code) for code in ["a", "b", "c"]]
+
+    interpreter._flushing = True
+    interpreter._drain_pending(futures[-1])
+
+    assert [future.result()["content"][0]["text"] for future in futures] == ["a", "b", "c"]
+    assert len(browser.scripts) == 3
+    assert not interpreter._flushing
+
+
+def test_electron_code_interpreter_leader_hands_off_after_its_own_result():
+    browser = FakeBrowser(limit=1)
+    interpreter = ElectronCodeInterpreter(browser)
+    futures = [_queue(interpreter, code) for code in ["a", "b", "c"]]
+
+    interpreter._flushing = True
+    interpreter._drain_pending(futures[0])
+
+    assert futures[0].result(timeout=0)["content"][0]["text"] == "a"
+    assert not futures[1].done() and not futures[2].done()
+    assert len(browser.scripts) == 1
+    assert interpreter._flushing
+    assert interpreter._next_leader is futures[1]
+
+
+def test_electron_code_interpreter_resets_after_interrupted_flush():
+    interpreter = ElectronCodeInterpreter(FakeBrowser(error=KeyboardInterrupt()))
+    waiting = _queue(interpreter, "queued")
+
+    with pytest.raises(KeyboardInterrupt):
+        _execute(interpreter, "print(1)")
+
+    assert not interpreter._flushing
+    assert waiting.result(timeout=0)["content"][0]["text"] == "Bridge error: flush interrupted"
+
+    interpreter.browser_tool = FakeBrowser()
+    assert _execute(interpreter, "print(2)")["content"][0]["text"] == "print(2)"
+
+
+def test_electron_code_interpreter_reports_bridge_errors():
+    interpreter = ElectronCodeInterpreter(FakeBrowser(error=RuntimeError("CDP gone")))
+
+    result = _execute(interpreter, "print(1)")
+
+    assert result["status"] == "error"
+    assert "CDP gone" in result["content"][0]["text"]
+    assert not interpreter._flushing
@@ -2,8 +2,10 @@
 Tests for the file_read tool using the Agent interface.
 """
 
+import difflib
 import io
 import os
+import shutil
 import tempfile
 import unittest.mock
 
@@ -280,6 +282,37 @@ def test_find_files_function():
         assert len(files) == 2  # Should not find test3.txt in subdir
 
 
+def test_get_file_stats_rescans_modified_file(temp_test_file):
+    """Test that memoized file stats are refreshed when the file changes."""
+    mock_console = unittest.mock.Mock()
+
+    stats = file_read.get_file_stats(mock_console, temp_test_file)
+    assert stats["line_count"] == 3
+    assert file_read.get_file_stats(mock_console, temp_test_file) == stats
+
+    with open(temp_test_file, "a") as f:
+        f.write("\nLine 4: Appended\r\nLine 5: Last")
+
+    stats = file_read.get_file_stats(mock_console, temp_test_file)
+    assert stats["line_count"] == 5
+    assert "Line 4: Appended" in stats["preview"]
+
+
+def test_get_file_stats_does_not_cache_long_previews(tmp_path):
+    """Test that previews over PREVIEW_CACHE_MAX_CHARS are read again instead of cached."""
+    mock_console = unittest.mock.Mock()
+    long_line = "x" * file_read.PREVIEW_CACHE_MAX_CHARS
+    path = tmp_path / "long.txt"
+    path.write_text(f"{long_line}\nshort\n")
+
+    stats = file_read.get_file_stats(mock_console, str(path))
+
+    st = os.stat(path)
+    assert file_read._scan_file_cached(os.path.realpath(path), st.st_size, st.st_mtime_ns) == (2, None)
+    assert stats["line_count"] == 2
+    assert stats["preview"] == f"{long_line}\n\nshort\n"
+
+
 def test_split_path_list_function():
     """Test the split_path_list utility function."""
     paths = "path1.txt,path2.md, path3.py"
@@ -324,3 +357,22 @@ def test_file_read_error_message_brackets():
     result = file_read.file_read(tool=tool_use)
 
     assert result["status"] == "error"
+
+
+@pytest.mark.skipif(not shutil.which("git"), reason="needs git")
+def test_create_diff_large_files_matches_difflib_layout(tmp_path):
+    """Above LARGE_DIFF_LINES the git histogram diff is laid out like difflib's unified diff."""
+    old_lines = [f"def line_{i}():\n" for i in range(file_read.LARGE_DIFF_LINES + 500)]
+    new_lines = list(old_lines)
+    new_lines[5000] = "def changed():\n"
+    new_lines[-1] = new_lines[-1].rstrip("\n")
+    old_path, new_path = tmp_path / "old.py", tmp_path / "new.py"
+    old_path.write_text("".join(old_lines))
+    new_path.write_text("".join(new_lines))
+
+    expected = "\n".join(difflib.unified_diff(old_lines, new_lines, fromfile="old.py", tofile="new.py", lineterm=""))
+    diff = file_read.create_diff(str(old_path), str(new_path))
+
+    assert "def line_4996" not in diff.split("\n")[2]  # no function context after the hunk range
+    assert "No newline at end of file" not in diff
+    assert diff == expected
@@ -0,0 +1,118 @@
+"""
+Tests for the Perplexity search client's result cache.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from strands_tools import PerplexitySearch as perplexity
+from strands_tools.PerplexitySearch import (
+    PerplexitySearchClient,
+    SearchCache,
+    SearchConfig,
+    SearchResponse,
+    SearchResult,
+)
+
+
+def _response(title="Result"):
+    return SearchResponse(results=[SearchResult(title=title, url="https://example.com", snippet="snippet")])
+
+
+def _client(cache=None):
+    client = PerplexitySearchClient(api_key="test-key", cache=cache)
+    client._search_uncached = AsyncMock(side_effect=lambda payload: _response(str(payload["query"])))
+    return client
+
+
+def test_search_cache_disabled_by_default():
+    client = _client()
+
+    asyncio.run(client.search_async(SearchConfig(query="what is c++")))
+    asyncio.run(client.search_async(SearchConfig(query="what is c++")))
+
+    assert client._search_uncached.await_count == 2
+
+
+def test_search_cache_hit_for_same_query_and_options():
+    client = _client(SearchCache())
+
+    first = asyncio.run(client.search_async(SearchConfig(query="what is  c++")))
+    second = asyncio.run(client.search_async(SearchConfig(query=" what is c++ ")))
+
+    assert client._search_uncached.await_count == 1
+    assert second == first
+
+
+def test_search_cache_misses_for_different_queries_and_options():
+    client = _client(SearchCache())
+
+    for config in [
+        SearchConfig(query="what is c++"),
+        SearchConfig(query="what is C#"),
+        SearchConfig(query="flights from paris to london"),
+        SearchConfig(query="flights from london to paris"),
+        SearchConfig(query="is aspirin safe? not"),
+        SearchConfig(query="is aspirin not safe"),
+        SearchConfig(query="what is c++", max_results=5),
+    ]:
+        asyncio.run(client.search_async(config))
+
+    assert client._search_uncached.await_count == 7
+
+
+def test_search_cache_returns_copies():
+    client = _client(SearchCache())
+
+    first = asyncio.run(client.search_async(SearchConfig(query="query")))
+    first.results.clear()
+    second = asyncio.run(client.search_async(SearchConfig(query="query")))
+
+    assert client._search_uncached.await_count == 1
+    assert len(second.results) == 1
+
+
+def test_search_cache_expires_after_ttl():
+    cache = SearchCache(ttl=10)
+    client = _client(cache)
+
+    with patch("strands_tools.PerplexitySearch.time.monotonic", return_value=100.0):
+        asyncio.run(client.search_async(SearchConfig(query="query")))
+    with patch("strands_tools.PerplexitySearch.time.monotonic", return_value=105.0):
+        asyncio.run(client.search_async(SearchConfig(query="query")))
+    assert client._search_uncached.await_count == 1
+
+    with patch("strands_tools.PerplexitySearch.time.monotonic", return_value=111.0):
+        asyncio.run(client.search_async(SearchConfig(query="query")))
+    assert client._search_uncached.await_count == 2
+
+
+def test_search_cache_skips_errors_and_evicts_oldest():
+    cache = SearchCache(max_entries=1)
+    cache.put(SearchCache.key_for({"query": "a"}), _response("a"))
+    cache.put(SearchCache.key_for({"query": "b"}), _response("b"))
+
+    assert cache.get(SearchCache.key_for({"query": "a"})) is None
+    assert cache.get(SearchCache.key_for({"query": "b"})).results[0].title == "b"
+
+    client = _client(SearchCache())
+    client._search_uncached = AsyncMock(return_value=SearchResponse(results=[], error="Rate limited"))
+    asyncio.run(client.search_async(SearchConfig(query="query")))
+    asyncio.run(client.search_async(SearchConfig(query="query")))
+    assert client._search_uncached.await_count == 2
+
+
+def test_perplexity_search_tool_caches_per_api_key(monkeypatch):
+    monkeypatch.setattr(perplexity, "_tool_caches", {})
+    search = AsyncMock(side_effect=lambda payload: _response(str(payload["query"])))
+    monkeypatch.setattr(PerplexitySearchClient, "_search_uncached", search)
+
+    monkeypatch.setenv("PERPLEXITY_API_KEY", "key-a")
+    first = perplexity.perplexity_search("what is c++")
+    second = perplexity.perplexity_search("what is c++")
+    assert search.await_count == 1
+    assert second == first
+
+    monkeypatch.setenv("PERPLEXITY_API_KEY", "key-b")
+    perplexity.perplexity_search("what is c++")
+    assert search.await_count == 2